@@ -0,0 +1,357 @@
+# Phase 1: extraction benchmarks for RoleModelConnect
+# Measures how fast each extraction backend turns sample pages into text
+#
+# Usage:
+#   python phase1_benchmark.py parsers [--repeat N] [--archive DIR]
+#   python phase1_benchmark.py extract [--repeat N] [--archive DIR]
+#   python phase1_benchmark.py strainer [--repeat N] [--archive DIR]
+#   python phase1_benchmark.py pool [--repeat N] [--archive DIR]
+#   python phase1_benchmark.py engines [--repeat N] [--archive DIR]
+#   python phase1_benchmark.py decode [--repeat N] [--archive DIR]
+
+import argparse
+import html
+import os
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+
+from phase1_extract import (
+    CONTENT_SELECTORS, CONTENT_TAGS, DEFAULT_PARSER, ENGINES, EXTRACTORS, STRIP_TAGS,
+    ParsePool, SoupExtractor, available_backends, clean_text, decode_html, extract_page, get_extractor,
+)
+from phase1_store import RawArchive
+
+RAW_DATA_FOLDER = "Raw_Data"
+
+
+def build_sample_page(raw_path):
+    """
+    Rebuild a realistic news-style HTML page around a Raw_Data text file.
+
+    The article paragraphs come from the raw file; navigation, scripts,
+    ads, related stories and a footer are wrapped around them the way
+    the publishers we scrape do, so the benchmark parses the same kind
+    of tree scrape_url sees in production.
+    """
+    content = Path(raw_path).read_text(encoding='utf-8')
+    body = content.split("=" * 80, 1)[-1]
+    paragraphs = [p.strip() for p in body.split('\n\n') if p.strip()]
+
+    script = "<script>window.dataLayer=window.dataLayer||[];" + "var ad=1;" * 200 + "</script>"
+    style = "<style>" + ".ad-slot{display:block;margin:0 auto;}" * 100 + "</style>"
+    nav = "<nav><ul>" + "".join(
+        f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(40)
+    ) + "</ul></nav>"
+    ads = "".join(
+        f'<div class="ad-slot" id="ad-{i}"><iframe src="https://ads.example/{i}"></iframe>'
+        f'<p>Advertisement</p></div>' for i in range(6)
+    )
+    related = '<aside class="related"><h3>Related stories</h3><ul>' + "".join(
+        f'<li><a href="/story/{i}">Related headline number {i}</a></li>' for i in range(15)
+    ) + "</ul></aside>"
+
+    article = [f"<h1>{html.escape(paragraphs[0])}</h1>"]
+    for i, paragraph in enumerate(paragraphs[1:], 1):
+        article.append(f"<p>{html.escape(paragraph)}</p>")
+        if i % 4 == 0:
+            article.append(ads[: len(ads) // 3])
+    article.append("<blockquote><p>Quoted line one.</p><p>Quoted line two.</p></blockquote>")
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Sample</title>"
+        f"{style}{script}</head><body>"
+        f"<header><div class=\"logo\">Publisher</div>{nav}<p>Subscribe to our newsletter</p></header>"
+        f"{ads}<main><article class=\"article-content\">{''.join(article)}</article>{related}</main>"
+        f"{script}<footer><p>Copyright Publisher</p>{nav}</footer></body></html>"
+    ).encode('utf-8')
+
+
+def load_pages(archive_folder=None):
+    """
+    Pages to benchmark: archived bodies when an archive is given,
+    otherwise one rebuilt page per Raw_Data text file.
+
+    Returns:
+        list: (label, html bytes) pairs
+    """
+    if archive_folder:
+        archive = RawArchive()
+        archive.open(archive_folder)
+        pages = []
+        for url in archive.urls():
+            archived = archive.get(url)
+            if archived:
+                pages.append((url, archived[0]))
+        archive.close()
+        if pages:
+            return pages
+        print(f"⚠ No archived pages in {archive_folder}; using Raw_Data samples.")
+
+    return [
+        (path.name, build_sample_page(path))
+        for path in sorted(Path(RAW_DATA_FOLDER).glob("*.txt"))
+    ]
+
+
+def time_it(func, pages, repeat):
+    """Run func over every page `repeat` times; return (seconds, last outputs)."""
+    outputs = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [func(body) for _, body in pages]
+    return time.perf_counter() - started, outputs
+
+
+def bench_parsers(pages, repeat):
+    """Pages per second for every installed parser backend."""
+    print(f"\n{'='*80}")
+    print(f"PARSER BACKENDS ({len(pages)} pages x {repeat} rounds)")
+    print(f"{'='*80}")
+
+    reference = None
+    for name in available_backends():
+        extractor = get_extractor(name)
+        elapsed, outputs = time_it(extractor.extract, pages, repeat)
+        if reference is None:
+            reference = outputs
+        same = sum(a == b for a, b in zip(outputs, reference))
+        rate = len(pages) * repeat / elapsed
+        print(f"{name:<14} {rate:8.1f} pages/s   identical to html.parser: {same}/{len(pages)}")
+
+    missing = [name for name in EXTRACTORS if name not in available_backends()]
+    if missing:
+        print(f"(not installed: {', '.join(missing)})")
+
+
+def two_pass_extract(soup):
+    """
+    The original scrape_url extraction, kept as the reference output:
+    decompose STRIP_TAGS, select the container, then call get_text()
+    twice per block.
+    """
+    for script in soup(STRIP_TAGS):
+        script.decompose()
+
+    main_content = None
+    for selector in CONTENT_SELECTORS:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+    if not main_content:
+        main_content = soup.body
+
+    if main_content:
+        paragraphs = main_content.find_all(CONTENT_TAGS)
+        text = '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+    else:
+        text = soup.get_text(separator='\n\n', strip=True)
+    return clean_text(text)
+
+
+def bench_extract(pages, repeat):
+    """
+    Single-pass extraction versus the original two-pass extraction.
+
+    Parsing is done up front so only the extraction stage is timed; the
+    outputs must be byte-identical.
+    """
+    print(f"\n{'='*80}")
+    print(f"EXTRACTION STAGE: two-pass vs single-pass ({len(pages)} pages x {repeat} rounds)")
+    print(f"{'='*80}")
+
+    for features in ("html.parser", "lxml"):
+        if features not in available_backends():
+            continue
+        extractor = SoupExtractor(features)
+
+        # two_pass_extract mutates the tree, so each round gets fresh soups
+        soups = [[extractor.parse(body) for _, body in pages] for _ in range(repeat)]
+        started = time.perf_counter()
+        reference = [[two_pass_extract(soup) for soup in round_soups] for round_soups in soups][-1]
+        two_pass = time.perf_counter() - started
+
+        soups = [[extractor.parse(body) for _, body in pages] for _ in range(repeat)]
+        started = time.perf_counter()
+        outputs = [[extractor.extract_from_soup(soup).text for soup in round_soups] for round_soups in soups][-1]
+        single_pass = time.perf_counter() - started
+
+        identical = sum(a.encode('utf-8') == b.encode('utf-8') for a, b in zip(outputs, reference))
+        total = len(pages) * repeat
+        print(f"{features}:")
+        print(f"  two-pass     {total / two_pass:9.1f} pages/s")
+        print(f"  single-pass  {total / single_pass:9.1f} pages/s   "
+              f"({two_pass / single_pass:.2f}x faster)")
+        print(f"  byte-identical output: {identical}/{len(pages)}")
+        for (label, _), a, b in zip(pages, outputs, reference):
+            if a != b:
+                print(f"  ✗ differs: {label}")
+
+
+def peak_memory(func, pages):
+    """Largest tracemalloc peak (bytes) of func over the pages, and its mean."""
+    peaks = []
+    for _, body in pages:
+        tracemalloc.start()
+        result = func(body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+    return max(peaks), sum(peaks) / len(peaks)
+
+
+def bench_strainer(pages, repeat):
+    """
+    Full parse versus parse-time filtering (StrainedSoup).
+
+    Reports wall-clock parse time and tracemalloc peak memory while the
+    tree is built, then checks that extraction output is unchanged.
+    Memory is measured in a separate pass because tracing slows parsing.
+    """
+    print(f"\n{'='*80}")
+    print(f"PARSE-TIME FILTERING: full tree vs strained ({len(pages)} pages x {repeat} rounds)")
+    print(f"{'='*80}")
+
+    for features in ("html.parser", "lxml"):
+        if features not in available_backends():
+            continue
+        full = SoupExtractor(features)
+        strained = SoupExtractor(features, strained=True)
+
+        print(f"{features}:")
+        for label, extractor in (("full", full), ("strained", strained)):
+            elapsed, _ = time_it(extractor.parse, pages, repeat)
+            peak, mean_peak = peak_memory(extractor.parse, pages)
+            print(f"  {label:<9} parse {1000 * elapsed / (len(pages) * repeat):7.2f} ms/page   "
+                  f"peak memory {mean_peak / 1024:8.0f} KiB avg, {peak / 1024:8.0f} KiB max")
+
+        identical = 0
+        for label, body in pages:
+            if strained.extract(body) == full.extract(body):
+                identical += 1
+            else:
+                print(f"  ✗ differs: {label}")
+        print(f"  identical extraction: {identical}/{len(pages)}")
+
+
+def bench_pool(pages, repeat):
+    """
+    Extraction throughput in this process versus a ParsePool of 1..N
+    worker processes (N = CPU cores), as phase1_curation runs it with
+    --parse-processes. Pool start-up is excluded from the timings.
+    """
+    cores = os.cpu_count() or 1
+    work = pages * repeat
+    print(f"\n{'='*80}")
+    print(f"PARSE STAGE: in-process vs worker processes ({len(work)} pages, {cores} cores)")
+    print(f"{'='*80}")
+
+    started = time.perf_counter()
+    reference = [extract_page(body).text for _, body in work]
+    inline = time.perf_counter() - started
+    print(f"in-process      {len(work) / inline:8.1f} pages/s")
+
+    workers = 1
+    while True:
+        pool = ParsePool()
+        pool.start(workers)
+        pool.collect(pool.submit(work[0][1], DEFAULT_PARSER))  # spawn a worker up front
+
+        started = time.perf_counter()
+        in_flight = deque()
+        outputs = []
+        for _, body in work:
+            while in_flight and pool.full():
+                outputs.append(pool.collect(in_flight.popleft()).text)
+            in_flight.append(pool.submit(body, DEFAULT_PARSER))
+        while in_flight:
+            outputs.append(pool.collect(in_flight.popleft()).text)
+        elapsed = time.perf_counter() - started
+        pool.close()
+
+        same = sum(a == b for a, b in zip(outputs, reference))
+        print(f"{workers:>2} process(es)  {len(work) / elapsed:8.1f} pages/s   "
+              f"({inline / elapsed:.2f}x, identical {same}/{len(work)})")
+        if workers >= cores:
+            break
+        workers = min(cores, workers * 2)
+
+
+def bench_engines(pages, repeat):
+    """
+    Selector list versus text-density container choice, per page: the
+    container picked, characters kept and extraction time.
+    """
+    print(f"\n{'='*80}")
+    print(f"EXTRACTION ENGINES ({len(pages)} pages x {repeat} rounds, {DEFAULT_PARSER})")
+    print(f"{'='*80}")
+
+    for label, body in pages:
+        print(f"{label[:60]}")
+        for engine in ENGINES:
+            timings = [extract_page(body, engine=engine, dedup=True) for _ in range(repeat)]
+            result = timings[-1]
+            fastest = min(r.seconds for r in timings)
+            print(f"  {engine:<10} {1000 * fastest:7.2f} ms   {len(result.text):7d} chars   "
+                  f"container: {result.selector}")
+
+
+def bench_decode(pages, repeat):
+    """
+    Parsing raw bytes (the parser sniffs the charset itself) versus
+    decode_html followed by parsing text, with and without the pages'
+    <meta charset>. Output must not change.
+    """
+    print(f"\n{'='*80}")
+    print(f"DECODING: parser sniffing vs decode_html ({len(pages)} pages x {repeat} rounds)")
+    print(f"{'='*80}")
+
+    variants = [
+        ("meta charset", pages),
+        ("no declaration", [(label, body.replace(b'<meta charset="utf-8">', b'')) for label, body in pages]),
+    ]
+    for features in ("html.parser", "lxml"):
+        if features not in available_backends():
+            continue
+        extractor = get_extractor(features)
+        print(f"{features}:")
+        for variant, variant_pages in variants:
+            sniffing, reference = time_it(extractor.extract, variant_pages, repeat)
+            decoding, outputs = time_it(lambda body: extractor.extract(decode_html(body).text), variant_pages, repeat)
+            decode_only, _ = time_it(decode_html, variant_pages, repeat)
+            total = len(variant_pages) * repeat
+            same = sum(a == b for a, b in zip(outputs, reference))
+            print(f"  {variant:<15} sniffing {1000 * sniffing / total:7.2f} ms/page   "
+                  f"decode_html {1000 * decoding / total:7.2f} ms/page "
+                  f"(of which decoding {1000 * decode_only / total:5.2f})   identical {same}/{len(variant_pages)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RoleModelConnect - Phase 1 extraction benchmarks")
+    parser.add_argument("benchmark", choices=["parsers", "extract", "strainer", "pool", "engines", "decode"], help="Which benchmark to run")
+    parser.add_argument("--repeat", type=int, default=20, help="Rounds over the page set (default: 20)")
+    parser.add_argument("--archive", metavar="DIR", help="Benchmark archived pages instead of Raw_Data samples")
+    args = parser.parse_args()
+
+    pages = load_pages(args.archive)
+    if not pages:
+        print(f"No sample pages found in {RAW_DATA_FOLDER}/ or the archive.")
+        return
+
+    if args.benchmark == "parsers":
+        bench_parsers(pages, args.repeat)
+    elif args.benchmark == "extract":
+        bench_extract(pages, args.repeat)
+    elif args.benchmark == "strainer":
+        bench_strainer(pages, args.repeat)
+    elif args.benchmark == "pool":
+        bench_pool(pages, args.repeat)
+    elif args.benchmark == "engines":
+        bench_engines(pages, args.repeat)
+    elif args.benchmark == "decode":
+        bench_decode(pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
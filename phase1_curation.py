@@ -9,17 +9,40 @@ Original file is located at
 
 # Import required libraries
 import requests
-from bs4 import BeautifulSoup
 import os
 import time
 import argparse
-import urllib.robotparser as robotparser
-from urllib.parse import urlparse
+import asyncio
+import contextlib
+import csv
+import json
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 import re
 
+from phase1_fetch import (
+    ACCEPT_ENCODING, ADAPTIVE_MAX_CONCURRENCY, ADAPTIVE_MIN_DELAY, ALLOWED_CONTENT_TYPES, BACKOFF_BASE, BANDWIDTH,
+    BREAKER_COOLDOWN, BREAKER_THRESHOLD, BREAKERS,
+    MAX_RESPONSE_BYTES, MAX_RETRIES, POOL_CONNECTIONS, POOL_MAXSIZE, RETRY_POLICY,
+    ROBOTS_CACHE, ROBOTS_TTL, SESSIONS, FetchAborted, FetchedPage,
+    PolitenessScheduler, canonicalize_url, parse_retry_after, read_body,
+)
+from phase1_extract import (
+    DEFAULT_PARSER, ENGINES, EXTRACTORS, ParsePool, canonical_link, extract_page, get_extractor, limit_text,
+)
+from phase1_store import (
+    BOILERPLATE_MIN_PAGES, BOILERPLATE_SHARE, BoilerplateTable, CrawlJournal, NegativeCache, RawArchive,
+    SeenUrls, SelectorCache, SimHashIndex, ValidatorStore, simhash,
+)
+
 # Configuration
 OUTPUT_FOLDER = "Raw_Data"
+STATE_FOLDER = "Crawl_State"  # journals and caches that let later runs skip work
 REQUEST_DELAY = 2  # seconds between requests to avoid overloading servers
+MIN_CONTENT_LENGTH = 500  # characters a page needs before it is saved
+DEFAULT_CONCURRENCY = 1  # 1 keeps the original sequential behaviour
 
 # Create output folder if it doesn't exist
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -35,19 +58,77 @@ def clean_filename(text):
 
 USER_AGENT = "RoleModelConnectBot/1.0 (+https://example.com)"
 
+# Per-domain politeness: REQUEST_DELAY apart unless robots.txt sets a Crawl-delay
+SCHEDULER = PolitenessScheduler(REQUEST_DELAY, USER_AGENT)
+
+# Outcome counters for the whole run (urls, saved, robots, too_short, duplicate,
+# near_duplicate, negative_cache, flagged, error, retries)
+RUN_STATS = Counter()
+_stats_lock = threading.Lock()
+
+# Per-URL outcome journal used by --resume
+JOURNAL = CrawlJournal()
+
+# Compressed, content-addressed copies of every fetched page (used by --replay)
+ARCHIVE = RawArchive()
+
+# ETag / Last-Modified of saved pages, for conditional GETs on re-crawls
+VALIDATORS = ValidatorStore()
+
+# Content selector that last worked on each domain, tried first next time
+SELECTOR_CACHE = SelectorCache()
+
+# Paragraphs repeated across each domain's pages, dropped as boilerplate
+BOILERPLATE = BoilerplateTable()
+
+# Canonical URL owned by each source, so duplicates are neither fetched nor saved
+SEEN = SeenUrls()
+
+# SimHash of every saved document, to catch near-duplicate text across sources
+NEAR_DUPLICATES = SimHashIndex()
+NEAR_DUP_OPTIONS = {
+    "mode": "flag",  # flag: save with a header note; skip: do not save; off
+}
+
+# Accepted texts per role model waiting for the duplicate checks, which
+# run in source-index order (see save_held_sources)
+HELD_SOURCES = {}
+_held_lock = threading.Lock()
+
+# URLs that recently gave a 404, a robots.txt denial or a thin page, skipped unfetched
+NEGATIVE_CACHE = NegativeCache()
+
+def record_outcome(role_model_name, index, url, outcome, filepath=None):
+    """
+    Count an outcome in RUN_STATS and append it to the journal (thread-safe).
+
+    `robots` and `too_short` outcomes also go to NEGATIVE_CACHE; a saved
+    or unchanged page clears the URL from it. Whatever the outcome, the
+    URL is done with as far as BANDWIDTH is concerned.
+    """
+    with _stats_lock:
+        RUN_STATS[outcome] += 1
+    JOURNAL.record(role_model_name, index, url, outcome, filepath)
+    BANDWIDTH.discard(url)
+    if outcome in ("saved", "not_modified"):
+        SEEN.settle(role_model_name, index, url, filepath)
+        NEGATIVE_CACHE.discard(url)
+    else:
+        SEEN.release(role_model_name, index, url)
+        NEGATIVE_CACHE.add(url, outcome)
+
 def is_allowed_by_robots(url, user_agent=USER_AGENT):
     """
     Check robots.txt to see if we are allowed to scrape this URL.
     Returns True if allowed or robots.txt is unreachable, False if explicitly disallowed.
+
+    robots.txt is downloaded at most once per host per ROBOTS_CACHE TTL.
     """
     parsed = urlparse(url)
-    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-    rp = robotparser.RobotFileParser()
-    rp.set_url(robots_url)
+    status, rp = ROBOTS_CACHE.lookup(url)
 
-    try:
-        rp.read()
-    except Exception:
+    if status == ROBOTS_CACHE.UNREACHABLE:
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
         print(f"  ⚠ Could not read robots.txt from {robots_url}. Proceeding cautiously.")
         # If robots.txt can’t be read, we choose to proceed but log it.
         return True
@@ -57,93 +138,320 @@ def is_allowed_by_robots(url, user_agent=USER_AGENT):
         print(f"  ✗ Disallowed by robots.txt for {parsed.netloc}. Skipping this URL.")
     return allowed
 
-def scrape_url(url, headers=None):
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+
+# How extract_text turns HTML into text (see phase1_extract)
+EXTRACT_OPTIONS = {
+    "parser": DEFAULT_PARSER,
+    "engine": "selectors",  # how the content container is chosen (see phase1_extract.ENGINES)
+    "selector_cache": True,  # try each domain's last working selector first
+    "strained": False,  # filter the tree while parsing (BeautifulSoup backends)
+    "dedup": True,  # innermost block owns its text; repeated blocks dropped
+    "max_chars": None,  # per-document character budget
+}
+
+# Time spent extracting pages this run (per-page figures are printed as they finish)
+EXTRACT_TIMING = {
+    "pages": 0, "seconds": 0.0, "slowest": 0.0, "slowest_url": None,
+    "decode_seconds": 0.0, "decoded_by": Counter(),
+}
+
+# Parse/extract stage; when started, pages are extracted in worker processes
+PARSE_POOL = ParsePool()
+
+# Per-response download limits (see read_body)
+FETCH_LIMITS = {
+    "max_bytes": MAX_RESPONSE_BYTES,
+    "allowed_types": ALLOWED_CONTENT_TYPES,
+}
+
+def fetch_url(url, headers=None):
     """
-    Scrape text content from a single URL
+    Download a single URL and archive the response body
+
+    The body is streamed under FETCH_LIMITS: responses with a disallowed
+    Content-Type or more than the maximum number of bytes are aborted
+    before they are buffered in full. Wire and decoded sizes go to
+    BANDWIDTH. Timeouts, connection errors and
+    429/5xx answers are retried under RETRY_POLICY (honouring
+    Retry-After), and hosts whose circuit BREAKERS has opened fail
+    immediately. A 404 or 410 puts the URL in NEGATIVE_CACHE.
 
     Args:
-        url (str): The URL to scrape
+        url (str): The URL to fetch
         headers (dict): Optional headers for the request
 
     Returns:
-        str: Extracted text content or None if failed
+        FetchedPage: The successful response, or None if failed
+    """
+    attempt = 0
+    while True:
+        page, delay = fetch_attempt(url, headers, attempt)
+        if delay is None:
+            return page
+        attempt += 1
+        time.sleep(delay)
+
+def fetch_attempt(url, headers=None, attempt=0):
+    """
+    Make one attempt at fetching a URL for fetch_url
+
+    Does not sleep before a retry: it returns the wait instead, so the
+    asyncio engine can wait without holding a fetch slot.
+
+    Args:
+        url (str): The URL to fetch
+        headers (dict): Optional headers for the request
+        attempt (int): Retries already made for this URL
+
+    Returns:
+        tuple: (page, delay) - the FetchedPage (or None if failed) and
+            None when done, or (None, seconds to wait) before retrying
     """
     if headers is None:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        headers = DEFAULT_HEADERS
 
-    try:
+    if attempt == 0:
         print(f"  Fetching: {url}")
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-
-        # Try to find main content area (common patterns)
-        main_content = None
-
-        # Try different content selectors
-        selectors = [
-            'article',
-            'main',
-            '[role="main"]',
-            '.article-content',
-            '.post-content',
-            '.entry-content',
-            '#content',
-            '.content'
-        ]
-
-        for selector in selectors:
-            main_content = soup.select_one(selector)
-            if main_content:
-                break
+    if not BREAKERS.allow(url):
+        print(f"  ✗ Skipped {url}: {BREAKERS.host_for(url)} is failing, circuit open")
+        return None, None
+
+    retry_after = None
+    started = time.monotonic()
+    try:
+        with SESSIONS.get().get(url, headers=headers, timeout=15, stream=True) as response:
+            SCHEDULER.observe(
+                url, time.monotonic() - started,
+                failed=response.status_code in RETRY_POLICY.statuses,
+            )
+            if response.status_code in RETRY_POLICY.statuses:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            response.raise_for_status()
+            content, wire_bytes = b"", 0
+            if response.status_code != 304:
+                content, wire_bytes = read_body(response, **FETCH_LIMITS)
+                BANDWIDTH.record(url, wire_bytes, len(content))
+            page = FetchedPage(url, response.status_code, response.headers, content)
+        BREAKERS.record_success(url)
+        if page.status_code != 304:
+            ARCHIVE.put(url, page.content, page.headers, page.status_code)
+        return page, None
 
-        # If no main content found, use body
-        if not main_content:
-            main_content = soup.body
+    except FetchAborted as e:
+        BREAKERS.record_success(url)
+        if e.wire_bytes:
+            BANDWIDTH.record(url, e.wire_bytes, e.decoded_bytes)
+        print(f"  ✗ Skipped {url}: {str(e)}")
+        return None, None
+    except requests.exceptions.RequestException as e:
+        error = e
+    except Exception as e:
+        BREAKERS.abandon(url)
+        print(f"  ✗ Unexpected error: {str(e)}")
+        return None, None
 
-        # Extract text
-        if main_content:
-            # Get all paragraphs
-            paragraphs = main_content.find_all(['p', 'h1', 'h2', 'h3', 'blockquote'])
-            text = '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+    if not isinstance(error, requests.exceptions.HTTPError) and RETRY_POLICY.is_transient(error):
+        SCHEDULER.observe(url, failed=True)  # timeout or connection error
+    if not RETRY_POLICY.is_transient(error):
+        if isinstance(error, requests.exceptions.HTTPError):
+            BREAKERS.record_success(url)  # e.g. a 404: the host itself is fine
+            if error.response is not None and error.response.status_code in (404, 410):
+                NEGATIVE_CACHE.add(url, "not_found")
         else:
-            text = soup.get_text(separator='\n\n', strip=True)
+            BREAKERS.abandon(url)  # e.g. an invalid URL: says nothing about the host
+        print(f"  ✗ Error scraping {url}: {str(error)}")
+        return None, None
+
+    if BREAKERS.record_failure(url):
+        print(f"  ✗ Error scraping {url}: {str(error)}")
+        print(f"  ⚠ Too many failures on {BREAKERS.host_for(url)}: its URLs fail fast "
+              f"for the next {BREAKERS.cooldown:.0f} seconds")
+        return None, None
+    delay = RETRY_POLICY.delay(attempt, retry_after)
+    if delay is None:
+        print(f"  ✗ Error scraping {url}: {str(error)}")
+        return None, None
+
+    # The retry also takes its place in the host's rate limit
+    delay = max(delay, SCHEDULER.reserve(url))
+    with _stats_lock:
+        RUN_STATS["retries"] += 1
+    print(f"  ⚠ {str(error)}; retry {attempt + 1}/{RETRY_POLICY.retries} in {delay:.1f} seconds")
+    return None, delay
+
+def has_enough_content(text):
+    """Minimum content check applied before a page is saved."""
+    return bool(text) and len(text) > MIN_CONTENT_LENGTH
+
+def _selector_hint(url):
+    """(domain, cached selector) for a page URL, or (None, None) without the cache."""
+    if url is None or not EXTRACT_OPTIONS["selector_cache"] or EXTRACT_OPTIONS["engine"] != "selectors":
+        return None, None
+    domain = urlparse(url).netloc.lower()
+    return domain, SELECTOR_CACHE.preferred(domain)
+
+def _learn_selector(domain, preferred, result):
+    """Record an extraction in the selector cache and return its text."""
+    if domain is not None:
+        SELECTOR_CACHE.record(domain, preferred, result.selector, has_enough_content(result.text))
+    return result.text
 
-        # Clean up excessive whitespace
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r' {2,}', ' ', text)
+def _finish_extraction(url, domain, preferred, result):
+    """Learn from an extraction, then drop boilerplate and apply the character budget."""
+    with _stats_lock:
+        EXTRACT_TIMING["pages"] += 1
+        EXTRACT_TIMING["seconds"] += result.seconds
+        if result.seconds >= EXTRACT_TIMING["slowest"]:
+            EXTRACT_TIMING["slowest"] = result.seconds
+            EXTRACT_TIMING["slowest_url"] = url
+        EXTRACT_TIMING["decode_seconds"] += result.decode_seconds
+        EXTRACT_TIMING["decoded_by"][result.decoded.source] += 1
+    text = strip_boilerplate(url, _learn_selector(domain, preferred, result))
+    return limit_text(text, EXTRACT_OPTIONS["max_chars"])
 
-        print(f"  ✓ Successfully scraped {len(text)} characters")
+def strip_boilerplate(url, text):
+    """Drop the paragraphs BOILERPLATE has learned repeat across the URL's domain."""
+    if not BOILERPLATE.enabled or url is None:
         return text
+    paragraphs = BOILERPLATE.filter(urlparse(url).netloc.lower(), url, text.split('\n\n'))
+    return '\n\n'.join(paragraphs)
 
-    except requests.exceptions.RequestException as e:
-        print(f"  ✗ Error scraping {url}: {str(e)}")
+def content_type_of(headers):
+    """The Content-Type of response (or archived) headers, or None."""
+    for name, value in (headers or {}).items():
+        if name.lower() == "content-type":
+            return value
+    return None
+
+def extract_text(html, url=None, content_type=None):
+    """
+    Extract the main readable text from an HTML document
+
+    Uses the parser backend and engine selected in EXTRACT_OPTIONS. When
+    the page's URL is given and the selector cache is on, the selector cached for
+    its domain is tried first; if that selector matches but yields too
+    little text, the full selector list is used instead. Paragraphs that
+    repeat across the domain's pages are dropped (see BOILERPLATE), and
+    the text is cut to the character budget, if one is set.
+
+    Args:
+        html (bytes or str): The raw HTML
+        url (str): Optional URL the page came from
+        content_type (str): Optional Content-Type header, whose charset
+            is trusted when decoding bytes (see decode_html)
+
+    Returns:
+        str: Extracted text content
+    """
+    return _extract(html, url, content_type)[0]
+
+def _extract(html, url=None, content_type=None):
+    """extract_text, also returning extract_page's Extraction."""
+    domain, preferred = _selector_hint(url)
+    result = extract_page(
+        html, EXTRACT_OPTIONS["parser"], EXTRACT_OPTIONS["strained"], preferred, MIN_CONTENT_LENGTH,
+        EXTRACT_OPTIONS["dedup"], EXTRACT_OPTIONS["engine"], content_type,
+    )
+    return _finish_extraction(url, domain, preferred, result), result
+
+def _report_scraped(text, result):
+    """Print the per-page extraction line with its timings."""
+    decoded = result.decoded
+    print(f"  ✓ Successfully scraped {len(text)} characters ({1000 * result.seconds:.1f} ms; "
+          f"{decoded.encoding or 'text'} from {decoded.source}, decoded in {1000 * result.decode_seconds:.2f} ms)")
+
+def _extract_or_none(html, url=None, content_type=None):
+    """Run extract_text, reporting the outcome like scrape_url always has."""
+    try:
+        text, result = _extract(html, url, content_type)
+    except Exception as e:
+        print(f"  ✗ Unexpected error: {str(e)}")
         return None
+    _report_scraped(text, result)
+    return text
+
+def submit_extraction(html, url, content_type=None):
+    """
+    Queue a page on PARSE_POOL instead of extracting it in this process.
+
+    Blocks while the pool already holds its maximum of pending pages.
+
+    Returns:
+        tuple: A job for collect_extraction
+    """
+    domain, preferred = _selector_hint(url)
+    future = PARSE_POOL.submit(
+        html, EXTRACT_OPTIONS["parser"], EXTRACT_OPTIONS["strained"], preferred, MIN_CONTENT_LENGTH,
+        EXTRACT_OPTIONS["dedup"], EXTRACT_OPTIONS["engine"], content_type,
+    )
+    return future, url, domain, preferred
+
+def collect_extraction(job):
+    """Wait for a submit_extraction job and report it like _extract_or_none."""
+    future, url, domain, preferred = job
+    try:
+        result = PARSE_POOL.collect(future)
+        text = _finish_extraction(url, domain, preferred, result)
     except Exception as e:
         print(f"  ✗ Unexpected error: {str(e)}")
         return None
+    _report_scraped(text, result)
+    return text
 
-def save_raw_data(role_model_name, source_index, url, text_content):
+def scrape_url(url, headers=None):
     """
-    Save scraped text to /Raw_Data/ folder
+    Scrape text content from a single URL
 
     Args:
-        role_model_name (str): Name of the role model
-        source_index (int): Index of the source (1, 2, 3, etc.)
-        url (str): Original URL (for reference)
-        text_content (str): The scraped text content
+        url (str): The URL to scrape
+        headers (dict): Optional headers for the request
 
     Returns:
-        str: Path to saved file
+        str: Extracted text content or None if failed
+    """
+    page = fetch_url(url, headers)
+    if page is None:
+        return None
+    return _extract_or_none(page.content, url, content_type_of(page.headers))
+
+def replay_body(url):
+    """
+    Load the archived response body for a URL
+
+    Returns:
+        tuple: (body bytes, archived Content-Type), or None if the URL
+            is not archived
+    """
+    archived = ARCHIVE.get(url)
+    if archived is None:
+        print(f"  ✗ Not in archive: {url}")
+        return None
+    body, entry = archived
+    print(f"  Replaying: {url} (fetched {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['fetched_at']))})")
+    return body, content_type_of(entry.get("headers"))
+
+def replay_url(url):
+    """
+    Re-extract text for a URL from the raw archive, without network access
+
+    Args:
+        url (str): The URL whose archived body should be used
+
+    Returns:
+        str: Extracted text content or None if not archived/failed
     """
+    archived = replay_body(url)
+    if archived is None:
+        return None
+    body, content_type = archived
+    return _extract_or_none(body, url, content_type)
+
+def raw_data_path(role_model_name, source_index, url):
+    """Path save_raw_data uses for a given role model, source index and URL."""
     # Create clean filename
     clean_name = clean_filename(role_model_name)
 
@@ -152,61 +460,679 @@ def save_raw_data(role_model_name, source_index, url, text_content):
     domain_clean = clean_filename(domain)
 
     filename = f"{clean_name}_{domain_clean}_source_{source_index}.txt"
-    filepath = os.path.join(OUTPUT_FOLDER, filename)
+    return os.path.join(OUTPUT_FOLDER, filename)
+
+def raw_file_url(filepath):
+    """The Source URL recorded in a raw file's header, or None if it is missing/unreadable."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            first = f.readline()
+    except OSError:
+        return None
+    if not first.startswith("Source URL: "):
+        return None
+    return first[len("Source URL: "):].rstrip("\n")
+
+def save_raw_data(role_model_name, source_index, url, text_content, near_duplicate_of=None):
+    """
+    Save scraped text to /Raw_Data/ folder
+
+    Args:
+        role_model_name (str): Name of the role model
+        source_index (int): Index of the source (1, 2, 3, etc.)
+        url (str): Original URL (for reference)
+        text_content (str): The scraped text content
+        near_duplicate_of (str): Raw file this text nearly duplicates, noted in the header
+
+    Returns:
+        str: Path to saved file
+    """
+    filepath = raw_data_path(role_model_name, source_index, url)
 
     # Save to file with UTF-8 encoding
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(f"Source URL: {url}\n")
         f.write(f"Scraped Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write(f"Role Model: {role_model_name}\n")
+        if near_duplicate_of:
+            f.write(f"Near Duplicate Of: {near_duplicate_of}\n")
         f.write("="*80 + "\n\n")
         f.write(text_content)
 
     print(f"  ✓ Saved to: {filepath}")
     return filepath
 
-def collect_data_for_role_model(role_model_name, url_list):
+def near_duplicate_of(role_model_name, index, url, text):
     """
-    Main function to scrape multiple URLs for one role model
+    Index a document's SimHash and look for a near-duplicate among the
+    role model's saved sources.
+
+    Returns:
+        str: Raw file path of the closest near-duplicate, or None
+    """
+    if not NEAR_DUPLICATES.enabled:
+        return None
+    match = NEAR_DUPLICATES.match_or_add(
+        role_model_name, simhash(text), raw_data_path(role_model_name, index, url), url,
+        add_duplicate=NEAR_DUP_OPTIONS["mode"] == "flag", index=index,
+    )
+    if match is None:
+        return None
+    entry, distance = match
+    print(f"  ⚠ Near duplicate of {entry['path']} ({distance} bits apart)")
+    return entry["path"]
+
+def _finish_source(role_model_name, index, url, text, headers=None, declared=None):
+    """
+    Apply the minimum content check and save one scraped source.
+
+    With the near-duplicate check or dedup on, an accepted text is held
+    instead and saved by save_held_sources() once the role model's
+    sources are done, so which source counts as the original (of a
+    near-duplicate or of a declared canonical page) follows source
+    order, not the order fetches happened to finish in. The journal
+    marks a held source `fetched` right away, so --resume after a crash
+    rebuilds it from the raw archive instead of downloading it again.
+
+    Args:
+        headers (Mapping): Response headers whose validators are kept
+            for the saved file (None when replaying)
+        declared (str): Canonical URL the page declares (see page_canonical)
+
+    Returns:
+        str: Path of the saved raw file, or None if skipped or held
+    """
+    if has_enough_content(text):  # Minimum content check
+        if NEAR_DUPLICATES.enabled or SEEN.enabled:
+            with _held_lock:
+                HELD_SOURCES.setdefault(role_model_name, []).append((index, url, text, headers, declared))
+            JOURNAL.record(role_model_name, index, url, "fetched")
+            return None
+        return _save_source(role_model_name, index, url, text, headers)
+    record_outcome(role_model_name, index, url, "too_short" if text is not None else "error")
+    print(f"  ⚠ Skipped: Insufficient content (less than 500 characters)")
+    return None
+
+def _save_source(role_model_name, index, url, text, headers=None, declared=None):
+    """Canonical claim, near-duplicate check and save for an accepted text; the raw file path or None."""
+    if declared is not None:
+        owner = claim_declared(role_model_name, index, url, declared)
+        if owner is not None:
+            print(f"  ⚠ Skipped: {url} declares the same canonical page as source {owner['index']}")
+            record_outcome(role_model_name, index, url, "duplicate", owner["path"])
+            return None
+    original = near_duplicate_of(role_model_name, index, url, text)
+    if original and NEAR_DUP_OPTIONS["mode"] == "skip":
+        record_outcome(role_model_name, index, url, "near_duplicate", original)
+        return None
+    if original:
+        with _stats_lock:
+            RUN_STATS["flagged"] += 1
+    filepath = save_raw_data(role_model_name, index, url, text, near_duplicate_of=original)
+    BANDWIDTH.record_kept(url, len(text.encode("utf-8")))
+    record_outcome(role_model_name, index, url, "saved", filepath)
+    if headers is not None:
+        VALIDATORS.update(url, headers, filepath)
+    return filepath
+
+def save_held_sources(role_model_name):
+    """
+    Save the role model's held sources in source-index order.
+
+    Returns:
+        list: (index, raw file path) of each source saved
+    """
+    with _held_lock:
+        held = sorted(HELD_SOURCES.pop(role_model_name, []), key=lambda source: source[0])
+    if held:
+        print(f"\nSaving {len(held)} sources in source order (duplicate checks):")
+    saved = []
+    for index, url, text, headers, declared in held:
+        print(f"\nSource {index}: {url}")
+        filepath = _save_source(role_model_name, index, url, text, headers, declared)
+        if filepath:
+            saved.append((index, filepath))
+    return saved
+
+def source_headers(role_model_name, index, url):
+    """Request headers for one source: conditional when its raw file is already on disk."""
+    conditional = VALIDATORS.conditional_headers(
+        url, raw_data_path(role_model_name, index, url)
+    )
+    return {**DEFAULT_HEADERS, **conditional}
+
+def fetch_source(role_model_name, index, url):
+    """
+    Fetch one source, conditionally when its raw file is already on disk.
+
+    Returns:
+        FetchedPage: The response (possibly a 304), or None if failed
+    """
+    return fetch_url(url, source_headers(role_model_name, index, url))
+
+def declared_canonical(url, html):
+    """Canonical form of the <link rel="canonical"> in a page, or None."""
+    href = canonical_link(html)
+    if not href:
+        return None
+    target = urljoin(url, href)
+    if urlparse(target).scheme not in ("http", "https"):
+        return None
+    return canonicalize_url(target)
+
+def canonical_key(url):
+    """
+    Canonical URL identifying a source before it is fetched
+
+    The URL's normal form, or the canonical URL its page declared the
+    last time it was fetched (looked up once in the archive, then
+    remembered in SEEN).
+    """
+    canonical = canonicalize_url(url)
+    declared = SEEN.resolve(canonical)
+    if declared is None and ARCHIVE.lookup(url):
+        archived = ARCHIVE.get(url)
+        declared = declared_canonical(url, archived[0]) if archived else None
+        SEEN.add_alias(canonical, declared or canonical)
+    return declared or canonical
+
+def skip_known_bad(role_model_name, sources, total):
+    """
+    Drop sources NEGATIVE_CACHE still lists as bad, recording them as skipped
 
     Args:
         role_model_name (str): Name of the role model
-        url_list (list): List of URLs to scrape
+        sources (list): (index, url) pairs still to process
+        total (int): Number of sources of the role model, for messages
 
     Returns:
-        list: List of successfully saved file paths
+        list: The (index, url) pairs that should be fetched
+    """
+    remaining = []
+    for index, url in sources:
+        reason = NEGATIVE_CACHE.skip(url)
+        if reason is None:
+            remaining.append((index, url))
+            continue
+        print(f"\nSource {index}/{total}:")
+        print(f"  ⚠ Skipped: {url} is cached as {reason} (no request sent)")
+        record_outcome(role_model_name, index, url, "negative_cache")
+    return remaining
+
+def resume_fetched(role_model_name, sources, total):
+    """
+    Hold again the sources an interrupted run fetched but had not saved
+
+    Their text is re-extracted from the raw archive (--resume), so they
+    are not downloaded again; sources missing from the archive are.
+
+    Returns:
+        list: The (index, url) pairs that still need a fetch
+    """
+    remaining = []
+    for index, url in sources:
+        archived = ARCHIVE.get(url) if JOURNAL.is_fetched(role_model_name, index, url) else None
+        if archived is None:
+            remaining.append((index, url))
+            continue
+        body, entry = archived
+        headers = requests.structures.CaseInsensitiveDict(entry.get("headers") or {})
+        print(f"\nSource {index}/{total}:")
+        print(f"  Resuming: {url} was fetched before the interruption, re-extracting from the archive")
+        declared = page_canonical(url, body) if SEEN.enabled else None
+        text = _extract_or_none(body, url, content_type_of(headers))
+        _finish_source(role_model_name, index, url, text, headers, declared)
+    return remaining
+
+def stale_claim(owner, destinations):
+    """
+    True if a claim saved by an earlier run no longer stands for its page
+
+    That is when a source of this run is about to write the claim's raw
+    file (raw files are named by source index, not URL), or the file no
+    longer holds the owner's page.
+
+    Args:
+        owner (dict): The claim ({"index", "url", "path"})
+        destinations (dict): Raw file path -> (index, url) of the source
+            of this run that writes it
+    """
+    if owner["path"] is None:
+        return False  # claimed earlier in this run
+    writer = destinations.get(owner["path"])
+    if writer is not None and writer != (owner["index"], owner["url"]):
+        return True
+    return raw_file_url(owner["path"]) != owner["url"]
+
+def claim_sources(role_model_name, sources, total):
+    """
+    Claim each source's canonical URL, dropping duplicates before fetching
+
+    A claim left by an earlier run whose raw file is stale (see
+    stale_claim) is dropped and the URL is claimed afresh.
+
+    Args:
+        role_model_name (str): Name of the role model
+        sources (list): (index, url) pairs
+        total (int): Number of sources, for the progress lines
+
+    Returns:
+        list: The (index, url) pairs that are not duplicates
+    """
+    destinations = {raw_data_path(role_model_name, index, url): (index, url) for index, url in sources}
+    unique = []
+    for index, url in sources:
+        canonical = canonical_key(url)
+        owner = SEEN.claim(role_model_name, index, url, canonical)
+        if owner is not None and stale_claim(owner, destinations):
+            SEEN.drop(role_model_name, canonical)
+            owner = SEEN.claim(role_model_name, index, url, canonical)
+        if owner is None:
+            unique.append((index, url))
+            continue
+        print(f"\nSource {index}/{total}:")
+        print(f"  ⚠ Skipped: same page as source {owner['index']} ({owner['url']})")
+        record_outcome(role_model_name, index, url, "duplicate", owner["path"])
+    return unique
+
+def page_canonical(url, body):
+    """
+    Canonical URL a fetched page declares, if it names one other than its own
+
+    Also remembered as the URL's alias in SEEN. The page claims it in
+    _save_source, in source-index order.
+    """
+    canonical = canonicalize_url(url)
+    declared = declared_canonical(url, body)
+    SEEN.add_alias(canonical, declared or canonical)
+    if declared is None or declared == canonical:
+        return None
+    return declared
+
+def claim_declared(role_model_name, index, url, declared):
+    """
+    Claim the canonical URL a saved page declared
+
+    Returns:
+        dict: The source that already owns that page, or None
+    """
+    owner = SEEN.claim(role_model_name, index, url, declared)
+    if owner is not None and stale_claim(owner, {}):
+        SEEN.drop(role_model_name, declared)
+        owner = SEEN.claim(role_model_name, index, url, declared)
+    return owner
+
+def needs_extraction(page):
+    """True if a fetch result carries a body to extract (not a failure or a 304)."""
+    return page is not None and page.status_code != 304
+
+def complete_source(role_model_name, index, url, page, job=None):
+    """
+    Extract and save a fetched source, or reuse its raw file on a 304.
+
+    Args:
+        job (tuple): submit_extraction job already running for this page;
+            without one the page is extracted here
+
+    Returns:
+        str: Path of the raw file for this source, or None if skipped
+    """
+    if page is not None and page.status_code == 304:
+        filepath = raw_data_path(role_model_name, index, url)
+        print(f"  ✓ Not modified since last crawl, keeping: {filepath}")
+        record_outcome(role_model_name, index, url, "not_modified", filepath)
+        return filepath
+
+    declared = None
+    if SEEN.enabled and needs_extraction(page):
+        declared = page_canonical(url, page.content)
+
+    if job is not None:
+        print(f"  Parsed source {index}: {url}")
+        text = collect_extraction(job)
+    else:
+        text = _extract_or_none(page.content, url, content_type_of(page.headers)) if page is not None else None
+    return _finish_source(
+        role_model_name, index, url, text, page.headers if page is not None else None, declared
+    )
+
+def _complete_parsed(role_model_name, item):
+    """Complete a fetched source whose page went to PARSE_POOL; [(index, path)] if saved."""
+    index, url, page, job = item
+    filepath = complete_source(role_model_name, index, url, page, job)
+    return [(index, filepath)] if filepath else []
+
+def _finish_parsed(role_model_name, item):
+    """Save a replayed source whose page went to PARSE_POOL; [path] if saved."""
+    index, url, job = item
+    print(f"  Parsed source {index}: {url}")
+    filepath = _finish_source(role_model_name, index, url, collect_extraction(job))
+    return [filepath] if filepath else []
+
+def prepare_sources(role_model_name, url_list, replay=False):
+    """
+    Announce a role model and drop the sources that need no fetch
+
+    Skips sources the journal already completed (--resume), sources
+    NEGATIVE_CACHE lists (unless replaying) and sources whose canonical
+    URL another source already owns. Sources an interrupted run had
+    fetched but not saved are re-extracted from the archive and held.
+
+    Returns:
+        list: The (index, url) pairs still to process
     """
     print(f"\n{'='*80}")
     print(f"Collecting data for: {role_model_name}")
     print(f"{'='*80}")
+    with _stats_lock:
+        RUN_STATS["role_models"] += 1
+        RUN_STATS["urls"] += len(url_list)
+
+    # Skip sources the journal already has a final outcome for (--resume)
+    pending = [
+        (index, url) for index, url in enumerate(url_list, 1)
+        if not JOURNAL.is_done(role_model_name, index, url)
+    ]
+    if len(pending) < len(url_list):
+        with _stats_lock:
+            RUN_STATS["resumed"] += len(url_list) - len(pending)
+        print(f"Resuming: {len(url_list) - len(pending)} sources already completed")
+
+    # Skip sources recently found to be 404, disallowed or thin, without fetching them
+    if NEGATIVE_CACHE.enabled and not replay:
+        pending = skip_known_bad(role_model_name, pending, len(url_list))
+
+    # Skip sources whose page another source already covers
+    if SEEN.enabled:
+        pending = claim_sources(role_model_name, pending, len(url_list))
+
+    # Rebuild sources fetched before an interruption from the archive (--resume)
+    if ARCHIVE.enabled and not replay:
+        pending = resume_fetched(role_model_name, pending, len(url_list))
+    return pending
+
+def collect_data_for_role_model(role_model_name, url_list, concurrency=DEFAULT_CONCURRENCY,
+                                replay=False):
+    """
+    Main function to scrape multiple URLs for one role model
+
+    Args:
+        role_model_name (str): Name of the role model
+        url_list (list): List of URLs to scrape
+        concurrency (int): Maximum number of URLs fetched in parallel.
+            Values above 1 use the asyncio fetch engine.
+        replay (bool): Re-extract from the raw archive instead of fetching
+
+    When PARSE_POOL is started, extraction runs in its worker processes
+    while the next pages are fetched (or read from the archive).
+
+    Returns:
+        list: List of successfully saved file paths
+    """
+    pending = prepare_sources(role_model_name, url_list, replay)
+
+    if replay:
+        saved_files = []
+        in_flight = deque()  # (index, url, job) waiting on PARSE_POOL
+        for index, url in pending:
+            print(f"\nSource {index}/{len(url_list)}:")
+            if not PARSE_POOL.enabled:
+                filepath = _finish_source(role_model_name, index, url, replay_url(url))
+                if filepath:
+                    saved_files.append(filepath)
+                continue
+            while in_flight and PARSE_POOL.full():
+                saved_files += _finish_parsed(role_model_name, in_flight.popleft())
+            archived = replay_body(url)
+            if archived is None:
+                _finish_source(role_model_name, index, url, None)
+            else:
+                body, content_type = archived
+                in_flight.append((index, url, submit_extraction(body, url, content_type)))
+        while in_flight:
+            saved_files += _finish_parsed(role_model_name, in_flight.popleft())
+        saved_files += [filepath for _, filepath in save_held_sources(role_model_name)]
+        print(f"\n✓ Completed: {len(saved_files)}/{len(url_list)} sources re-extracted from archive")
+        return saved_files
+
+    if concurrency > 1:
+        saved_files = asyncio.run(
+            collect_data_async(role_model_name, url_list, concurrency, pending)
+        )
+        print(f"\n✓ Completed: {len(saved_files)}/{len(url_list)} sources successfully scraped")
+        return saved_files
 
     saved_files = []
+    in_flight = deque()  # (index, url, page, job) waiting on PARSE_POOL
 
-    for index, url in enumerate(url_list, 1):
+    while pending:
+        # Take the first URL whose domain is ready; only wait when none is
+        ready = [SCHEDULER.ready_at(url) for _, url in pending]
+        now = time.monotonic()
+        position = next((i for i, at in enumerate(ready) if at <= now), None)
+        if position is None:
+            position = ready.index(min(ready))
+        index, url = pending.pop(position)
         print(f"\nSource {index}/{len(url_list)}:")
 
         # Check robots.txt before scraping
         if not is_allowed_by_robots(url):
             print("  Skipping due to robots.txt rules.")
+            record_outcome(role_model_name, index, url, "robots")
             continue
 
-        # Scrape the URL
-        text = scrape_url(url)
+        # Finish parsed pages, making room in the parse pool if it is full
+        while in_flight and (in_flight[0][3][0].done() or PARSE_POOL.full()):
+            saved_files += _complete_parsed(role_model_name, in_flight.popleft())
 
-        if text and len(text) > 500:  # Minimum content check
-            filepath = save_raw_data(role_model_name, index, url, text)
-            saved_files.append(filepath)
-        else:
-            print(f"  ⚠ Skipped: Insufficient content (less than 500 characters)")
+        # Respect the per-domain delay, then scrape the URL
+        SCHEDULER.acquire(url)
+        page = fetch_source(role_model_name, index, url)
 
-        # Delay between requests to be respectful
-        if index < len(url_list):
-            print(f"  Waiting {REQUEST_DELAY} seconds before next request...")
-            time.sleep(REQUEST_DELAY)
+        if PARSE_POOL.enabled and needs_extraction(page):
+            in_flight.append((index, url, page, submit_extraction(
+                page.content, url, content_type_of(page.headers)
+            )))
+            continue
+        filepath = complete_source(role_model_name, index, url, page)
+        if filepath:
+            saved_files.append((index, filepath))
+
+    while in_flight:
+        saved_files += _complete_parsed(role_model_name, in_flight.popleft())
+    saved_files += save_held_sources(role_model_name)
 
+    saved_files = [filepath for _, filepath in sorted(saved_files)]
     print(f"\n✓ Completed: {len(saved_files)}/{len(url_list)} sources successfully scraped")
     return saved_files
 
+class AsyncFrontier:
+    """
+    Fetch slots, per-host turns and worker threads of one asyncio run.
+
+    Shared by every role model fetched in the run, so a manifest's
+    records fetch side by side while `concurrency` still caps requests
+    in flight overall and each host still gets one request at a time
+    (more only when --adaptive raised its limit).
+    """
+
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.slots = asyncio.Semaphore(concurrency)
+        self._turns = {}
+        self._in_flight = Counter()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        # submit_extraction may block on a full PARSE_POOL, so it gets its
+        # own thread and never starves the threads that collect results
+        self.submitter = ThreadPoolExecutor(max_workers=1)
+
+    @contextlib.asynccontextmanager
+    async def host_turn(self, url):
+        """Wait until the URL's host has room (one request unless --adaptive raised it)."""
+        host = SCHEDULER.domain_for(url)
+        turn = self._turns.setdefault(host, asyncio.Condition())
+        async with turn:
+            await turn.wait_for(lambda: self._in_flight[host] < SCHEDULER.concurrency_for(url))
+            self._in_flight[host] += 1
+        try:
+            yield
+        finally:
+            async with turn:
+                self._in_flight[host] -= 1
+                turn.notify_all()
+
+    def close(self):
+        """Wait for and shut down the worker threads."""
+        self.executor.shutdown()
+        self.submitter.shutdown()
+
+
+async def collect_data_async(role_model_name, url_list, concurrency, pending=None, frontier=None):
+    """
+    Asyncio fetch engine: scrape URLs on different hosts in parallel.
+
+    Requests to the same host are still serialised and spaced by the
+    shared SCHEDULER, exactly like the sequential loop; with --adaptive
+    the scheduler may allow a few in flight on a host that keeps up. Each URL keeps
+    its original source index, so the files written by save_raw_data
+    are the same as in a sequential run. When PARSE_POOL is started,
+    fetched pages are extracted in its worker processes. Retry waits are
+    awaited outside the `concurrency` slots, so a host that keeps
+    answering 429 holds up only its own URLs.
+
+    Args:
+        role_model_name (str): Name of the role model
+        url_list (list): List of URLs to scrape
+        concurrency (int): Maximum number of fetches in flight
+        pending (list): Optional (index, url) pairs to process; defaults
+            to every URL in url_list
+        frontier (AsyncFrontier): Slots and threads shared with other
+            role models (manifest mode); a private one by default
+
+    Returns:
+        list: Saved file paths, ordered by source index
+    """
+    loop = asyncio.get_running_loop()
+    own_frontier = frontier is None
+    if own_frontier:
+        frontier = AsyncFrontier(concurrency)
+    slots = frontier.slots
+    results = {}
+
+    async def fetch_one(index, url):
+        # Limited requests in flight per host, paced by the domain's token bucket
+        async with frontier.host_turn(url):
+            async with slots:
+                print(f"\nSource {index}/{len(url_list)}:")
+                allowed = await loop.run_in_executor(frontier.executor, is_allowed_by_robots, url)
+                if not allowed:
+                    print("  Skipping due to robots.txt rules.")
+                    record_outcome(role_model_name, index, url, "robots")
+                    return
+            await SCHEDULER.acquire_async(url)
+            headers = source_headers(role_model_name, index, url)
+            job = None
+            attempt = 0
+            while True:
+                async with slots:
+                    page, delay = await loop.run_in_executor(
+                        frontier.executor, fetch_attempt, url, headers, attempt
+                    )
+                    # Queue the page for the parse processes before giving the
+                    # slot back, so a full parse pool holds back new fetches
+                    if PARSE_POOL.enabled and needs_extraction(page):
+                        job = await loop.run_in_executor(
+                            frontier.submitter, submit_extraction, page.content, url,
+                            content_type_of(page.headers),
+                        )
+                if delay is None:
+                    break
+                # Back off without a slot, so other hosts keep fetching
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        if job is not None:
+            await asyncio.wrap_future(job[0])
+        filepath = await loop.run_in_executor(
+            frontier.executor, complete_source, role_model_name, index, url, page, job
+        )
+        if filepath:
+            results[index] = filepath
+
+    try:
+        if pending is None:
+            pending = list(enumerate(url_list, 1))
+        await asyncio.gather(*(fetch_one(index, url) for index, url in pending))
+        held = await loop.run_in_executor(frontier.executor, save_held_sources, role_model_name)
+    finally:
+        if own_frontier:
+            frontier.close()
+
+    for index, filepath in held:
+        results[index] = filepath
+    return [results[index] for index in sorted(results)]
+
+async def collect_manifest_async(records, concurrency, records_in_flight):
+    """
+    Fetch a streamed manifest through one asyncio frontier.
+
+    Up to `records_in_flight` records are collected at once, all sharing
+    one AsyncFrontier, so the `concurrency` fetch slots stay busy across
+    record boundaries instead of draining at the end of every record.
+    Records are read from `records` only as slots free up, so memory
+    stays bounded for large manifests. Each record keeps its own source
+    indices and near-duplicate order; two records with the same role
+    model name never run at the same time.
+
+    Args:
+        records (iterable): (role model name, url list) pairs, e.g. iter_manifest()
+        concurrency (int): Maximum number of fetches in flight overall
+        records_in_flight (int): Maximum number of records collected at once
+    """
+    loop = asyncio.get_running_loop()
+    frontier = AsyncFrontier(concurrency)
+    window = asyncio.Semaphore(records_in_flight)
+    active = {}  # role model -> task collecting its latest record
+    failures = []
+
+    async def collect_record(role_model_name, url_list):
+        try:
+            pending = await loop.run_in_executor(
+                frontier.executor, prepare_sources, role_model_name, url_list
+            )
+            saved_files = await collect_data_async(
+                role_model_name, url_list, concurrency, pending, frontier
+            )
+            print(f"\n✓ Completed {role_model_name}: "
+                  f"{len(saved_files)}/{len(url_list)} sources successfully scraped")
+        finally:
+            window.release()
+
+    def finished(role_model_name, task):
+        if active.get(role_model_name) is task:
+            del active[role_model_name]
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task.exception())
+
+    try:
+        for role_model_name, url_list in records:
+            await window.acquire()
+            if failures:
+                window.release()
+                break
+            previous = active.get(role_model_name)
+            if previous is not None:
+                await asyncio.wait([previous])  # same raw file names: one record at a time
+            task = asyncio.create_task(collect_record(role_model_name, url_list))
+            task.add_done_callback(lambda done, name=role_model_name: finished(name, done))
+            active[role_model_name] = task
+        if active:
+            await asyncio.wait(list(active.values()))
+    finally:
+        frontier.close()
+    if failures:
+        raise failures[0]
+
 def parse_args():
     """
     Parse optional CLI arguments.
@@ -227,9 +1153,381 @@ def parse_args():
         nargs="+",
         help="One or more seed URLs for this role model"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help="Batch mode: JSONL, CSV or YAML file of {name, urls} records"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="N",
+        help="Fetch up to N URLs in parallel across different hosts "
+             "(same-host requests stay serialised and rate limited; default: 1)"
+    )
+    parser.add_argument(
+        "--records-in-flight",
+        type=int,
+        metavar="N",
+        help="With --manifest and --concurrency above 1, collect up to N role models "
+             "at once through one shared set of fetch slots (default: twice --concurrency)"
+    )
+    parser.add_argument(
+        "--parser",
+        choices=list(EXTRACTORS),
+        default=DEFAULT_PARSER,
+        help="HTML parser backend for extraction (default: html.parser)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="selectors",
+        help="How the main content is found: the fixed selector list (default) or "
+             "text-density scoring, for layouts the selectors do not know"
+    )
+    parser.add_argument(
+        "--keep-repeated-blocks",
+        action="store_true",
+        help="Keep the text of nested blocks in every enclosing block (a <blockquote> "
+             "repeats its <p>s) and keep blocks that repeat within a page"
+    )
+    parser.add_argument(
+        "--max-chars",
+        type=int,
+        metavar="N",
+        help="Keep at most N characters of each page, cut at a paragraph boundary"
+    )
+    parser.add_argument(
+        "--no-selector-cache",
+        action="store_true",
+        help="Always walk the full content selector list instead of trying "
+             "each domain's last working selector first"
+    )
+    parser.add_argument(
+        "--strainer",
+        action="store_true",
+        help="Filter the document while parsing so script/style/nav/footer/header "
+             "subtrees and other unused elements are never built "
+             "(html.parser and lxml only)"
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="Parse and extract pages in N worker processes while fetching continues "
+             "(no N: one per CPU core; default: parse in the fetching process)"
+    )
+    parser.add_argument(
+        "--parse-queue",
+        type=int,
+        metavar="N",
+        help="Pages allowed to wait for or sit in the parse processes before "
+             "fetching pauses (default: twice the number of processes)"
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=MAX_RESPONSE_BYTES,
+        metavar="N",
+        help="Abort downloads larger than N bytes (default: 10 MiB, 0 = no limit)"
+    )
+    parser.add_argument(
+        "--allowed-types",
+        default=",".join(ALLOWED_CONTENT_TYPES),
+        metavar="TYPES",
+        help="Comma-separated Content-Type allowlist checked before reading the body "
+             "(default: text/html,application/xhtml+xml; empty = any)"
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="DIR",
+        help=f"Raw HTML archive folder (default: {STATE_FOLDER}/archive)"
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not keep compressed copies of fetched pages"
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Re-run extraction and saving from the archive with no network access"
+    )
+    parser.add_argument(
+        "--no-conditional",
+        action="store_true",
+        help="Always download full pages instead of sending If-None-Match/If-Modified-Since"
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Fetch every source even if another source of the same role model "
+             "has the same canonical URL"
+    )
+    parser.add_argument(
+        "--no-boilerplate",
+        action="store_true",
+        help="Keep paragraphs that repeat across a domain's pages (newsletter prompts, "
+             "ad labels, related-story blurbs)"
+    )
+    parser.add_argument(
+        "--no-negative-cache",
+        action="store_true",
+        help="Fetch URLs again even if they recently gave a 404, a robots.txt denial "
+             "or too little text"
+    )
+    parser.add_argument(
+        "--boilerplate-share",
+        type=float,
+        default=BOILERPLATE_SHARE,
+        metavar="F",
+        help="Drop a paragraph once it is on this fraction of a domain's pages "
+             f"(default: {BOILERPLATE_SHARE}, after {BOILERPLATE_MIN_PAGES} pages)"
+    )
+    parser.add_argument(
+        "--near-dup",
+        choices=["flag", "skip", "off"],
+        default="flag",
+        help="What to do with text that nearly duplicates a saved source of the same "
+             "role model: note it in the file header (default), skip it, or not check"
+    )
+    parser.add_argument(
+        "--near-dup-distance",
+        type=int,
+        default=3,
+        metavar="BITS",
+        help="Largest SimHash difference, in bits out of 64, counted as a near "
+             "duplicate (default: 3)"
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="FILE",
+        help=f"Per-URL outcome journal (default: {STATE_FOLDER}/journal.jsonl)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: skip URLs the journal already completed"
+    )
+    parser.add_argument(
+        "--robots-ttl",
+        type=float,
+        default=ROBOTS_TTL,
+        metavar="SECONDS",
+        help="How long a cached robots.txt stays valid (default: 24h)"
+    )
+    parser.add_argument(
+        "--robots-cache",
+        metavar="FILE",
+        help="Persist the robots.txt cache to this JSON file across runs"
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune each host's request rate and in-flight requests from its latency "
+             "and 429/5xx answers (AIMD), within its robots.txt Crawl-delay"
+    )
+    parser.add_argument(
+        "--min-delay",
+        type=float,
+        default=ADAPTIVE_MIN_DELAY,
+        metavar="SECONDS",
+        help="Shortest spacing --adaptive may reach on a host (default: 0.5)"
+    )
+    parser.add_argument(
+        "--max-host-concurrency",
+        type=int,
+        default=ADAPTIVE_MAX_CONCURRENCY,
+        metavar="N",
+        help="Most requests --adaptive lets run at once on one host (default: 4)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=MAX_RETRIES,
+        metavar="N",
+        help="Retries for timeouts, connection errors and 429/5xx responses (default: 3)"
+    )
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=BACKOFF_BASE,
+        metavar="SECONDS",
+        help="Base of the jittered exponential backoff between retries; a "
+             "Retry-After header takes precedence (default: 1)"
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=BREAKER_THRESHOLD,
+        metavar="N",
+        help="Consecutive failures after which a host's URLs fail fast "
+             "(default: 5, 0 = never)"
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=BREAKER_COOLDOWN,
+        metavar="SECONDS",
+        help="How long a failing host is skipped before one probe request (default: 60)"
+    )
+    parser.add_argument(
+        "--pool-connections",
+        type=int,
+        default=POOL_CONNECTIONS,
+        metavar="N",
+        help="Number of per-host keep-alive connection pools to keep (default: 10)"
+    )
+    parser.add_argument(
+        "--pool-maxsize",
+        type=int,
+        default=POOL_MAXSIZE,
+        metavar="N",
+        help="Keep-alive connections kept per host (default: 10)"
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.parse_processes is not None and args.parse_processes < 0:
+        parser.error("--parse-processes cannot be negative")
+    if args.parse_queue is not None and args.parse_queue < 1:
+        parser.error("--parse-queue must be at least 1")
+    if args.records_in_flight is not None and args.records_in_flight < 1:
+        parser.error("--records-in-flight must be at least 1")
+    if args.min_delay <= 0 or args.max_host_concurrency < 1:
+        parser.error("--min-delay must be positive and --max-host-concurrency at least 1")
+    if args.retries < 0 or args.backoff < 0 or args.breaker_threshold < 0:
+        parser.error("--retries, --backoff and --breaker-threshold cannot be negative")
+    if args.max_chars is not None and args.max_chars <= MIN_CONTENT_LENGTH:
+        parser.error(f"--max-chars must be above the {MIN_CONTENT_LENGTH}-character minimum")
+    if not 0 < args.boilerplate_share <= 1:
+        parser.error("--boilerplate-share must be above 0 and at most 1")
+    if not 0 <= args.near_dup_distance < 32:
+        parser.error("--near-dup-distance must be between 0 and 31")
+    try:
+        get_extractor(args.parser, args.strainer, args.engine)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.archive is None:
+        args.archive = os.path.join(STATE_FOLDER, "archive")
+    if args.replay and args.no_archive:
+        parser.error("--replay needs the archive; drop --no-archive")
+    if args.journal is None:
+        args.journal = os.path.join(STATE_FOLDER, "journal.jsonl")
+    if args.manifest and (args.name or args.urls):
+        parser.error("--manifest cannot be combined with --name/--urls")
+    return args
 
 
+def _split_urls(value):
+    """Turn a manifest `urls` field (list or delimited string) into a list."""
+    if isinstance(value, str):
+        return [u for u in re.split(r'[\s|;]+', value) if u]
+    if isinstance(value, list):
+        return [str(u).strip() for u in value if str(u).strip()]
+    return []
+
+def _iter_jsonl_manifest(f):
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            print(f"  ⚠ Manifest line {line_no}: invalid JSON ({e}). Skipping.")
+
+def _iter_csv_manifest(f):
+    for row_no, row in enumerate(csv.DictReader(f), 2):
+        yield row_no, row
+
+def _iter_yaml_manifest(f):
+    """
+    Stream records from a YAML manifest without loading the whole file.
+
+    Accepts a top-level sequence of records and/or one record per
+    document. PyYAML's event parser is used so only one record's events
+    are held in memory at a time.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise SystemExit("YAML manifests need PyYAML: pip install pyyaml")
+
+    wrappers = (yaml.StreamStartEvent, yaml.StreamEndEvent,
+                yaml.DocumentStartEvent, yaml.DocumentEndEvent)
+    in_top_sequence = False
+    record_events = None
+    level = 0
+    record_no = 0
+
+    for event in yaml.parse(f, Loader=yaml.SafeLoader):
+        if record_events is None:
+            if isinstance(event, wrappers):
+                continue
+            if isinstance(event, yaml.SequenceStartEvent) and not in_top_sequence:
+                in_top_sequence = True
+                continue
+            if isinstance(event, yaml.SequenceEndEvent) and in_top_sequence:
+                in_top_sequence = False
+                continue
+            record_events = []
+
+        record_events.append(event)
+        if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+            level += 1
+        elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+            level -= 1
+
+        if level == 0:
+            record_no += 1
+            document = yaml.emit([yaml.StreamStartEvent(), yaml.DocumentStartEvent(),
+                                  *record_events,
+                                  yaml.DocumentEndEvent(), yaml.StreamEndEvent()])
+            record_events = None
+            yield record_no, yaml.safe_load(document)
+
+def iter_manifest(path):
+    """
+    Stream (name, urls) records from a JSONL, CSV or YAML manifest.
+
+    The format is picked from the file extension. Each record needs a
+    `name` and a `urls` field; `urls` may be a list or a string of URLs
+    separated by whitespace, `|` or `;`. Invalid records are reported
+    and skipped.
+
+    Args:
+        path (str): Manifest file (.jsonl/.ndjson, .csv, .yaml/.yml)
+
+    Yields:
+        tuple: (role_model_name, url_list)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    readers = {
+        '.jsonl': _iter_jsonl_manifest,
+        '.ndjson': _iter_jsonl_manifest,
+        '.csv': _iter_csv_manifest,
+        '.yaml': _iter_yaml_manifest,
+        '.yml': _iter_yaml_manifest,
+    }
+    if extension not in readers:
+        raise SystemExit(f"Unsupported manifest format '{extension}' (use .jsonl, .csv or .yaml)")
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for record_no, record in readers[extension](f):
+            if not isinstance(record, dict):
+                print(f"  ⚠ Manifest record {record_no}: expected {{name, urls}}. Skipping.")
+                continue
+            name = str(record.get('name') or '').strip()
+            urls = _split_urls(record.get('urls'))
+            if not name or not urls:
+                print(f"  ⚠ Manifest record {record_no}: missing name or urls. Skipping.")
+                continue
+            yield name, urls
+
 def interactive_input():
     """Fallback interactive input for role model name and URLs."""
     print("\nInteractive mode: provide role model name and URLs.")
@@ -255,15 +1553,121 @@ def interactive_input():
 
     return role_model_name, urls
 
-def main():
-    """Main execution function"""
-    print("=" * 80)
-    print("RoleModelConnect - Phase 1: Data Collection Pipeline")
-    print("=" * 80)
-    print(f"Output folder: {OUTPUT_FOLDER}")
-    print("=" * 80)
+def configure_run(args):
+    """Apply CLI options to the shared fetch components."""
+    EXTRACT_OPTIONS["parser"] = args.parser
+    EXTRACT_OPTIONS["engine"] = args.engine
+    EXTRACT_OPTIONS["selector_cache"] = not args.no_selector_cache
+    EXTRACT_OPTIONS["strained"] = args.strainer
+    EXTRACT_OPTIONS["dedup"] = not args.keep_repeated_blocks
+    EXTRACT_OPTIONS["max_chars"] = args.max_chars
+    if args.parse_processes is not None:
+        PARSE_POOL.start(args.parse_processes or None, args.parse_queue)
+        print(f"Parsing in {PARSE_POOL.workers} worker processes "
+              f"(up to {PARSE_POOL.max_pending} pages queued)")
+    if not args.no_selector_cache:
+        SELECTOR_CACHE.open(os.path.join(STATE_FOLDER, "selectors.json"))
+    if not args.no_boilerplate:
+        BOILERPLATE.open(os.path.join(STATE_FOLDER, "boilerplate.json"), share=args.boilerplate_share)
+    FETCH_LIMITS["max_bytes"] = args.max_bytes
+    FETCH_LIMITS["allowed_types"] = tuple(
+        t.strip().lower() for t in args.allowed_types.split(",") if t.strip()
+    )
+    JOURNAL.open(args.journal, resume=args.resume)
+    if not args.no_archive:
+        ARCHIVE.open(args.archive)
+    if not args.no_conditional:
+        VALIDATORS.open(os.path.join(STATE_FOLDER, "validators.json"))
+    if not args.no_dedup:
+        SEEN.open(os.path.join(STATE_FOLDER, "seen.json"))
+    if not args.no_negative_cache:
+        NEGATIVE_CACHE.open(os.path.join(STATE_FOLDER, "negative.json"))
+    NEAR_DUP_OPTIONS["mode"] = args.near_dup
+    if args.near_dup != "off":
+        NEAR_DUPLICATES.open(
+            os.path.join(STATE_FOLDER, "simhash.jsonl"), max_distance=args.near_dup_distance
+        )
+    ROBOTS_CACHE.configure(ttl=args.robots_ttl, path=args.robots_cache)
+    RETRY_POLICY.configure(retries=args.retries, base=args.backoff)
+    SCHEDULER.configure(
+        adaptive=args.adaptive, min_delay=args.min_delay,
+        max_concurrency=args.max_host_concurrency,
+    )
+    BREAKERS.configure(threshold=args.breaker_threshold, cooldown=args.breaker_cooldown)
+    SESSIONS.configure(
+        pool_connections=args.pool_connections, pool_maxsize=args.pool_maxsize
+    )
 
-    args = parse_args()
+def finish_run():
+    """Close pooled connections, persist caches and print end-of-run statistics."""
+    SESSIONS.close()
+    PARSE_POOL.close()
+    JOURNAL.close()
+    ARCHIVE.close()
+    VALIDATORS.save()
+    SELECTOR_CACHE.save()
+    BOILERPLATE.save()
+    SEEN.save()
+    NEGATIVE_CACHE.save()
+    NEAR_DUPLICATES.close()
+    ROBOTS_CACHE.save()
+    print("\n" + "=" * 80)
+    ROBOTS_CACHE.report()
+    SELECTOR_CACHE.report()
+    if EXTRACT_TIMING["pages"]:
+        print(f"Extraction ({EXTRACT_OPTIONS['parser']}, {EXTRACT_OPTIONS['engine']}): "
+              f"{EXTRACT_TIMING['pages']} pages, "
+              f"{1000 * EXTRACT_TIMING['seconds'] / EXTRACT_TIMING['pages']:.1f} ms average, "
+              f"slowest {1000 * EXTRACT_TIMING['slowest']:.1f} ms ({EXTRACT_TIMING['slowest_url']})")
+        sources = ", ".join(f"{source} {count}" for source, count in EXTRACT_TIMING["decoded_by"].most_common())
+        print(f"Decoding: {1000 * EXTRACT_TIMING['decode_seconds'] / EXTRACT_TIMING['pages']:.2f} ms average "
+              f"(charset from: {sources})")
+    BOILERPLATE.report()
+    NEGATIVE_CACHE.report()
+    print(f"Retries: {RUN_STATS['retries']}")
+    BREAKERS.report()
+    BANDWIDTH.report()
+    SCHEDULER.report()
+
+def run_collection(args):
+    """Run manifest, CLI or interactive collection for the parsed arguments."""
+    # --- MANIFEST MODE: many role models streamed from one file ---
+    if args.manifest:
+        print(f"\nRunning in manifest mode ({args.manifest}).")
+        started = time.time()
+
+        if args.concurrency > 1 and not args.replay:
+            # One frontier across records, so fetching never drains between them
+            records_in_flight = args.records_in_flight or 2 * args.concurrency
+            print(f"Collecting up to {records_in_flight} role models at a time")
+            asyncio.run(collect_manifest_async(
+                iter_manifest(args.manifest), args.concurrency, records_in_flight
+            ))
+        else:
+            for role_model_name, url_list in iter_manifest(args.manifest):
+                collect_data_for_role_model(
+                    role_model_name, url_list, concurrency=args.concurrency,
+                    replay=args.replay
+                )
+
+        print("\n" + "=" * 80)
+        print("COLLECTION COMPLETE (MANIFEST MODE)")
+        print("=" * 80)
+        print(f"Role models processed: {RUN_STATS['role_models']}")
+        print(f"URLs processed:        {RUN_STATS['urls']}")
+        print(f"Files saved:           {RUN_STATS['saved']}")
+        print(f"Not modified (304):    {RUN_STATS['not_modified']}")
+        print(f"Skipped (robots.txt):  {RUN_STATS['robots']}")
+        print(f"Skipped (too short):   {RUN_STATS['too_short']}")
+        print(f"Skipped (duplicate):   {RUN_STATS['duplicate']}")
+        print(f"Skipped (near-dup):    {RUN_STATS['near_duplicate']}")
+        print(f"Skipped (known bad):   {RUN_STATS['negative_cache']}")
+        print(f"Flagged (near-dup):    {RUN_STATS['flagged']}")
+        print(f"Failed:                {RUN_STATS['error']}")
+        print(f"Resumed (skipped):     {RUN_STATS['resumed']}")
+        print(f"Elapsed:               {time.time() - started:.1f}s")
+        print(f"\n✓ All raw data saved to '{OUTPUT_FOLDER}/' folder")
+        return
 
     # --- CLI MODE: only one role model per run (explicit arguments) ---
     if args.name and args.urls:
@@ -271,7 +1675,10 @@ def main():
         url_list = args.urls
         print("\nRunning in CLI mode (arguments provided).")
 
-        all_saved_files = collect_data_for_role_model(role_model_name, url_list)
+        all_saved_files = collect_data_for_role_model(
+            role_model_name, url_list, concurrency=args.concurrency,
+            replay=args.replay
+        )
 
         print("\n" + "=" * 80)
         print("COLLECTION COMPLETE (CLI MODE)")
@@ -291,7 +1698,10 @@ def main():
         role_model_name, url_list = interactive_input()
 
         # 2. Collect data for this role model
-        saved_files = collect_data_for_role_model(role_model_name, url_list)
+        saved_files = collect_data_for_role_model(
+            role_model_name, url_list, concurrency=args.concurrency,
+            replay=args.replay
+        )
         all_saved_files_global.extend(saved_files)
 
         # 3. Ask if user wants to add another role model
@@ -319,5 +1729,21 @@ def main():
     print("2. Proceed to Phase 2: Data Curation")
     print("3. Create JSON entries based on these raw text files")
 
+def main():
+    """Main execution function"""
+    print("=" * 80)
+    print("RoleModelConnect - Phase 1: Data Collection Pipeline")
+    print("=" * 80)
+    print(f"Output folder: {OUTPUT_FOLDER}")
+    print("=" * 80)
+
+    args = parse_args()
+    configure_run(args)
+
+    try:
+        run_collection(args)
+    finally:
+        finish_run()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
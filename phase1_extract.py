@@ -0,0 +1,1163 @@
+# Phase 1: text extraction backends for RoleModelConnect
+# Turns raw HTML into the plain text that phase1_curation saves to Raw_Data
+
+import codecs
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+from bs4.element import CData, NavigableString
+
+try:
+    import charset_normalizer
+except ImportError:  # optional: undeclared non-UTF-8 pages fall back to windows-1252
+    charset_normalizer = None
+
+# Content containers tried in order; the first match is used
+CONTENT_SELECTORS = [
+    'article',
+    'main',
+    '[role="main"]',
+    '.article-content',
+    '.post-content',
+    '.entry-content',
+    '#content',
+    '.content'
+]
+
+# Block tags whose text is kept, and subtrees that are always dropped
+CONTENT_TAGS = ['p', 'h1', 'h2', 'h3', 'blockquote']
+STRIP_TAGS = ["script", "style", "nav", "footer", "header"]
+
+_CONTENT_TAG_SET = frozenset(CONTENT_TAGS)
+_STRIP_TAG_SET = frozenset(STRIP_TAGS)
+
+# String classes get_text() includes by default (no comments, doctypes,
+# script/style bodies, ...). Matched by exact type, as bs4 does.
+_TEXT_STRING_TYPES = frozenset((NavigableString, CData))
+
+DEFAULT_PARSER = "html.parser"
+
+# How much of a page canonical_link() scans for <link rel="canonical">
+CANONICAL_SCAN_BYTES = 256 * 1024
+_LINK_TAG = re.compile(rb'<link\b[^>]*>', re.IGNORECASE)
+_TAG_ATTR = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+
+# Selector forms the parse-time filter understands: tag, .class, #id, [attr...]
+_SIMPLE_SELECTOR = re.compile(
+    r'^(?:(?P<tag>[a-z][a-z0-9]*)|\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)[^\]]*\])$'
+)
+
+# StreamExtractor: characters fed to the tokenizer at a time, elements
+# that never hold children, and elements whose strings are not text
+STREAM_CHUNK_CHARS = 64 * 1024
+_VOID_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+_STRING_CONTAINER_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+_STREAM_SELECTOR = re.compile(
+    r'^(?:(?P<tag>[a-z][a-z0-9]*)|\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:=(?P<quote>["\']?)(?P<value>[^"\'\]]*)(?P=quote))?\])$'
+)
+_DECIMAL_REFERENCE = re.compile(r'^([0-9]+)(.*)')
+_HEX_REFERENCE = re.compile(r'^([0-9a-f]+)(.*)')
+
+# decode_html: how much of a page is searched for <meta charset> and fed
+# to the detector, and labels that browsers decode as windows-1252
+META_SCAN_BYTES = 4096
+DETECT_SCAN_BYTES = 64 * 1024
+_META_CHARSET = re.compile(rb'<meta\b[^>]*?charset\s*=\s*["\']?\s*([\w:.-]+)', re.IGNORECASE)
+_HTTP_CHARSET = re.compile(r'charset\s*=\s*["\']?\s*([\w:.-]+)', re.IGNORECASE)
+_WINDOWS_1252_LABELS = frozenset(["ascii", "us-ascii", "iso-8859-1", "iso8859-1", "latin1", "latin-1", "l1"])
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+# A decoded page: its text, the codec used and what chose it ("bom",
+# "http", "meta", "utf-8", "detected", "fallback", or "text" when the
+# page was already a str)
+Decoded = namedtuple("Decoded", ["text", "encoding", "source"])
+
+# Container choice: the CONTENT_SELECTORS list, or text-density scoring
+ENGINES = ["selectors", "density"]
+
+# DensityExtractor: blocks scored as paragraphs, the minimum length that
+# counts, and class/id words that mark content or clutter
+_DENSITY_BLOCKS = frozenset(['p', 'pre', 'td', 'blockquote'])
+DENSITY_MIN_BLOCK_CHARS = 25
+_POSITIVE_NAMES = re.compile(r'article|body|content|entry|main|post|story|text', re.IGNORECASE)
+_NEGATIVE_NAMES = re.compile(
+    r'ad-|advert|comment|footer|menu|nav|promo|related|share|sidebar|social|sponsor|widget',
+    re.IGNORECASE,
+)
+
+# Result of one extraction: the text, the selector that picked the
+# container ("body" for the <body> fallback, "density" for the density
+# engine, None if there was no body) and, from extract_page, the seconds
+# extraction took in total, how the page was decoded (a Decoded without
+# its text) and the seconds decoding took
+Extraction = namedtuple(
+    "Extraction", ["text", "selector", "seconds", "decoded", "decode_seconds"],
+    defaults=[None, None, None],
+)
+
+
+def selector_order(preferred_selector=None):
+    """CONTENT_SELECTORS with `preferred_selector` moved to the front."""
+    if preferred_selector not in CONTENT_SELECTORS:
+        return CONTENT_SELECTORS
+    return [preferred_selector] + [s for s in CONTENT_SELECTORS if s != preferred_selector]
+
+
+def canonical_link(html):
+    """
+    The href of a page's <link rel="canonical">, found without parsing.
+
+    Only the <head> (or the first CANONICAL_SCAN_BYTES) is scanned.
+
+    Args:
+        html (bytes or str): The raw HTML
+
+    Returns:
+        str: The href as written (possibly relative), or None
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'replace')
+    head = html[:CANONICAL_SCAN_BYTES]
+    end = head.lower().find(b'</head>')
+    if end >= 0:
+        head = head[:end]
+    for tag in _LINK_TAG.finditer(head):
+        attrs = {
+            match.group(1).lower(): match.group(2) or match.group(3) or match.group(4) or b''
+            for match in _TAG_ATTR.finditer(tag.group())
+        }
+        if b'canonical' in attrs.get(b'rel', b'').lower().split():
+            href = attrs.get(b'href', b'').strip()
+            if href:
+                return unescape(href.decode('utf-8', 'replace'))
+    return None
+
+
+def _codec_for(label):
+    """Python codec name for a charset label, or None if it is unknown."""
+    label = label.strip().lower()
+    if label in _WINDOWS_1252_LABELS:
+        return "cp1252"
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def decode_html(body, content_type=None):
+    """
+    Turn a response body into text before it reaches the parser.
+
+    Tried in order: a byte order mark, the Content-Type charset, a
+    <meta charset> in the first META_SCAN_BYTES, strict UTF-8, the
+    charset_normalizer detector (if installed, on the first
+    DETECT_SCAN_BYTES) and finally windows-1252. A declared charset the
+    whole body decodes under is preferred; if none does, the first known
+    declared charset is used anyway with invalid bytes replaced, and
+    detection only runs for pages that declare nothing. Labels for
+    Latin-1 and ASCII mean windows-1252, as they do in browsers.
+
+    Args:
+        body (bytes or str): The raw response body
+        content_type (str): The Content-Type header, if known
+
+    Returns:
+        Decoded: The text, the codec used and what chose it
+    """
+    if isinstance(body, str):
+        return Decoded(body, None, "text")
+
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return Decoded(body[len(bom):].decode(encoding, 'replace'), encoding, "bom")
+
+    declared = []
+    match = _HTTP_CHARSET.search(content_type or "")
+    if match:
+        declared.append((match.group(1), "http"))
+    match = _META_CHARSET.search(body, 0, META_SCAN_BYTES)
+    if match:
+        declared.append((match.group(1).decode('ascii', 'replace'), "meta"))
+    declared = [(_codec_for(label), source) for label, source in declared]
+    declared = [(encoding, source) for encoding, source in declared if encoding is not None]
+    for encoding, source in declared:
+        try:
+            return Decoded(body.decode(encoding), encoding, source)
+        except UnicodeDecodeError:
+            continue
+    if declared:
+        # Stray invalid bytes do not void the declaration: replace just those
+        encoding, source = declared[0]
+        return Decoded(body.decode(encoding, 'replace'), encoding, source)
+
+    try:
+        return Decoded(body.decode('utf-8'), 'utf-8', "utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(body[:DETECT_SCAN_BYTES]).best()
+        if best is not None and _codec_for(best.encoding):
+            encoding = _codec_for(best.encoding)
+            return Decoded(body.decode(encoding, 'replace'), encoding, "detected")
+
+    return Decoded(body.decode('cp1252', 'replace'), 'cp1252', "fallback")
+
+
+def clean_text(text):
+    """Collapse runs of blank lines and repeated spaces."""
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    return text
+
+
+def unique_blocks(blocks):
+    """Blocks in order with exact repeats dropped (first occurrence kept)."""
+    seen = set()
+    unique = []
+    for block in blocks:
+        if block not in seen:
+            seen.add(block)
+            unique.append(block)
+    return unique
+
+
+def limit_text(text, max_chars):
+    """
+    Cut extracted text down to a character budget at a block boundary.
+
+    Whole blocks are kept while they fit; if even the first block is too
+    long, it is cut at `max_chars`.
+
+    Args:
+        text (str): Extracted text, blocks separated by blank lines
+        max_chars (int): The budget (None or 0 for no limit)
+
+    Returns:
+        str: The text, at most `max_chars` characters long
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    cut = text.rfind('\n\n', 0, max_chars + 1)
+    if cut <= 0:
+        return text[:max_chars].rstrip()
+    return text[:cut]
+
+
+class Extractor:
+    """
+    Interface for an HTML-to-text backend.
+
+    Every backend applies the same rules: drop STRIP_TAGS subtrees, take
+    the first element matching CONTENT_SELECTORS (falling back to
+    <body>), and join the text of its CONTENT_TAGS with blank lines.
+    """
+
+    name = None
+
+    def extract(self, html):
+        """
+        Extract the main readable text from an HTML document.
+
+        Args:
+            html (bytes or str): The raw HTML
+
+        Returns:
+            str: Extracted text content
+        """
+        return self.extract_details(html).text
+
+    def extract_details(self, html, preferred_selector=None, dedup=False):
+        """
+        Extract text and report which selector matched.
+
+        Args:
+            html (bytes or str): The raw HTML
+            preferred_selector (str): Selector to try before the others,
+                e.g. the one that worked last time on this domain
+            dedup (bool): Give each string only to its innermost block (a
+                <blockquote> of <p>s no longer repeats their text) and
+                drop blocks whose text already appeared
+
+        Returns:
+            Extraction: The text and the selector used
+        """
+        raise NotImplementedError
+
+
+def _is_stripped(tag):
+    """True if `tag` is, or sits inside, a STRIP_TAGS element."""
+    while tag is not None:
+        if tag.name in _STRIP_TAG_SET:
+            return True
+        tag = tag.parent
+    return False
+
+
+def _walk_blocks(container, owned=False):
+    """
+    Collect CONTENT_TAGS texts under `container` in a single tree walk.
+
+    STRIP_TAGS subtrees are skipped instead of being decomposed first.
+    Each content block gets a slot in document order when it opens and
+    its text is written once when it closes. Strings inside nested
+    blocks count towards every enclosing block, exactly as
+    get_text(strip=True) on each block would, unless `owned` is set:
+    then a string only counts towards its innermost block.
+
+    Returns:
+        list: Non-empty block texts in document order
+    """
+    blocks = []
+    open_parts = []  # text fragments of the blocks currently open
+    stack = [(iter(container.contents), None)]
+
+    while stack:
+        children, slot = stack[-1]
+        for child in children:
+            if isinstance(child, Tag):
+                name = child.name
+                if name in _STRIP_TAG_SET:
+                    continue
+                if name in _CONTENT_TAG_SET:
+                    blocks.append(None)
+                    open_parts.append([])
+                    stack.append((iter(child.contents), len(blocks) - 1))
+                else:
+                    stack.append((iter(child.contents), None))
+                break
+            if type(child) in _TEXT_STRING_TYPES and open_parts:
+                stripped = child.strip()
+                if stripped:
+                    for parts in (open_parts[-1:] if owned else open_parts):
+                        parts.append(stripped)
+        else:
+            stack.pop()
+            if slot is not None:
+                blocks[slot] = ''.join(open_parts.pop())
+
+    return [block for block in blocks if block]
+
+
+def _walk_strings(root):
+    """Stripped text strings under `root`, skipping STRIP_TAGS subtrees."""
+    strings = []
+    stack = [iter(root.contents)]
+    while stack:
+        for child in stack[-1]:
+            if isinstance(child, Tag):
+                if child.name not in _STRIP_TAG_SET:
+                    stack.append(iter(child.contents))
+                    break
+            elif type(child) in _TEXT_STRING_TYPES:
+                stripped = child.strip()
+                if stripped:
+                    strings.append(stripped)
+        else:
+            stack.pop()
+    return strings
+
+
+def _candidate_filter(selectors):
+    """
+    Build a cheap (name, raw attrs) test that is True for every element
+    that could match one of `selectors`.
+
+    It may over-match (class and id are substring checks, attribute
+    selectors only need the attribute), which is harmless: the real CSS
+    match still runs on the parsed tree. Any selector it cannot read
+    makes it keep every element.
+    """
+    names, classes, ids, attrs = set(), [], [], set()
+    for selector in selectors:
+        match = _SIMPLE_SELECTOR.match(selector)
+        if match is None:
+            return lambda name, attributes: True
+        if match["tag"]:
+            names.add(match["tag"])
+        elif match["cls"]:
+            classes.append(match["cls"])
+        elif match["id"]:
+            ids.append(match["id"])
+        else:
+            attrs.add(match["attr"])
+
+    def may_match(name, attributes):
+        if name in names:
+            return True
+        if not attributes:
+            return False
+        value = attributes.get("class")
+        if value and any(c in value for c in classes):
+            return True
+        value = attributes.get("id")
+        if value and any(i in value for i in ids):
+            return True
+        return any(a in attributes for a in attrs)
+
+    return may_match
+
+
+class _DroppedVoid:
+    """
+    Returned for a filtered-out void element (<br>, <img>, ...) so that
+    html.parser's tree builder still records it as already closed and
+    swallows a stray </br> later, exactly as it does for a real Tag.
+    """
+
+    is_empty_element = True
+
+
+_DROPPED_VOID = _DroppedVoid()
+
+
+class StrainedSoup(BeautifulSoup):
+    """
+    BeautifulSoup that filters the document while it is being parsed.
+
+    STRIP_TAGS subtrees are never built, and of everything else only the
+    elements extraction can use become Tags: candidate containers,
+    CONTENT_TAGS, <body>, and tags whose strings bs4 types specially
+    (template, rt, rp). Text is only kept inside content blocks. The
+    tree builder's open elements, dropped ones included, are tracked on
+    a shadow stack so unclosed and mis-nested markup closes exactly as it
+    does in the full tree, and extraction output is unchanged.
+
+    A soup built this way only supports container selection and block
+    extraction. `body_kept` tells whether the document's first <body>
+    survived filtering; when it did not and no container matches,
+    extraction falls back to the text of the whole document, which
+    needs the full tree.
+    """
+
+    _may_be_candidate = staticmethod(_candidate_filter(CONTENT_SELECTORS))
+
+    def reset(self):
+        super().reset()
+        self._open = []        # [name, kept] for every element the builder has open
+        self._skip_from = None  # index in _open of the stripped subtree being skipped
+        self._blocks = 0       # content blocks currently open
+        self.body_kept = None  # set when the first <body> opens
+
+    def handle_starttag(self, name, namespace, nsprefix, attrs, *args, **kwargs):
+        self.endData()
+        # Void elements are closed straight away by the builder, so they
+        # are never tracked as open
+        void = self.builder.can_be_empty_element(name)
+        if name == "body" and self.body_kept is None:
+            self.body_kept = self._skip_from is None and name not in _STRIP_TAG_SET
+        if self._skip_from is None and name in _STRIP_TAG_SET:
+            self._skip_from = len(self._open)
+        if self._skip_from is not None:
+            if void:
+                return _DROPPED_VOID
+            self._open.append([name, False])
+            return None
+
+        if not (
+            name in _CONTENT_TAG_SET
+            or name == "body"
+            or name in self.builder.string_containers
+            or self._may_be_candidate(name, attrs)
+        ):
+            if void:
+                return _DROPPED_VOID
+            self._open.append([name, False])
+            return None
+
+        tag = super().handle_starttag(name, namespace, nsprefix, attrs, *args, **kwargs)
+        if tag is not None:
+            self._open.append([name, True])
+            if name in _CONTENT_TAG_SET:
+                self._blocks += 1
+        return tag
+
+    def handle_endtag(self, name, nsprefix=None):
+        self.endData()
+        # Close up to the most recent open element of this name, like _popToTag
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == name:
+                break
+        else:
+            return
+        for open_name, kept in reversed(self._open[i:]):
+            if kept:
+                self.popTag()
+                if open_name in _CONTENT_TAG_SET:
+                    self._blocks -= 1
+        del self._open[i:]
+        if self._skip_from is not None and i <= self._skip_from:
+            self._skip_from = None
+
+    def handle_data(self, data):
+        if self._blocks and self._skip_from is None:
+            super().handle_data(data)
+
+
+class SoupExtractor(Extractor):
+    """
+    BeautifulSoup extraction using one of its tree builders.
+
+    Instead of decomposing STRIP_TAGS across the whole tree and then
+    calling get_text() twice per block, the chosen container is walked
+    once (see _walk_blocks). Candidates inside stripped subtrees are
+    ignored during selection, so the output is byte-identical to the
+    decompose-then-select approach.
+    """
+
+    def __init__(self, features, strained=False):
+        self.name = features
+        self.features = features
+        self.strained = strained
+
+    def parse(self, html):
+        """Build the soup for a document (a StrainedSoup when strained)."""
+        if self.strained:
+            return StrainedSoup(html, self.features)
+        return BeautifulSoup(html, self.features)
+
+    def extract_details(self, html, preferred_selector=None, dedup=False):
+        soup = self.parse(html)
+        if self.strained and not soup.body_kept and not soup.css.select_one(", ".join(CONTENT_SELECTORS)):
+            # No container and no usable <body>: the text of the whole
+            # document is needed, which the filtered tree does not hold
+            soup = BeautifulSoup(html, self.features)
+        return self.extract_from_soup(soup, preferred_selector, dedup)
+
+    def extract_from_soup(self, soup, preferred_selector=None, dedup=False):
+        """Run selection and text extraction on an already parsed soup."""
+        # Try to find main content area (common patterns), ignoring
+        # anything inside script/style/nav/footer/header
+        main_content = None
+        for selector in selector_order(preferred_selector):
+            main_content = next(
+                (tag for tag in soup.css.iselect(selector) if not _is_stripped(tag)), None
+            )
+            if main_content:
+                break
+
+        # If no main content found, use body
+        if not main_content:
+            main_content = soup.body
+            if main_content is not None and _is_stripped(main_content):
+                main_content = None
+            selector = "body" if main_content else None
+
+        # Extract text
+        if main_content:
+            blocks = _walk_blocks(main_content, owned=dedup)
+        else:
+            blocks = _walk_strings(soup)
+        if dedup:
+            blocks = unique_blocks(blocks)
+
+        return Extraction(clean_text('\n\n'.join(blocks)), selector)
+
+
+def _lexbor_owned_blocks(container):
+    """
+    CONTENT_TAGS texts under a lexbor node, each string counted only
+    towards its innermost block (_walk_blocks with `owned`).
+    """
+    blocks = []
+    open_parts = []
+    stack = [(container.iter(include_text=True), None)]
+
+    while stack:
+        children, slot = stack[-1]
+        for child in children:
+            tag = child.tag
+            if tag == '-text':
+                if open_parts:
+                    stripped = child.text_content.strip()
+                    if stripped:
+                        open_parts[-1].append(stripped)
+            elif not tag.startswith('-'):
+                if tag in _CONTENT_TAG_SET:
+                    blocks.append(None)
+                    open_parts.append([])
+                    stack.append((child.iter(include_text=True), len(blocks) - 1))
+                else:
+                    stack.append((child.iter(include_text=True), None))
+                break
+        else:
+            stack.pop()
+            if slot is not None:
+                blocks[slot] = ''.join(open_parts.pop())
+
+    return [block for block in blocks if block]
+
+
+def _name_weight(tag):
+    """Readability-style bonus or penalty from an element's class and id."""
+    names = " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+    weight = 0
+    if _POSITIVE_NAMES.search(names):
+        weight += 25
+    if _NEGATIVE_NAMES.search(names):
+        weight -= 25
+    return weight
+
+
+def _density_scores(root):
+    """
+    Score every element under `root` as a possible content container in
+    one post-order walk.
+
+    Each paragraph-like block (_DENSITY_BLOCKS) of at least
+    DENSITY_MIN_BLOCK_CHARS characters scores 1 + its commas + one per
+    100 characters (at most 3), credited in full to its parent and by
+    half to its grandparent. An element's total, plus its class/id
+    weight, is scaled by the share of its text that is not link text.
+    STRIP_TAGS subtrees are skipped.
+
+    Returns:
+        dict: id(element) -> (element, score), for elements that scored
+    """
+    scores = {}
+    # Per open element: [tag, children, text chars, link chars, commas, credit]
+    stack = [[root, iter(root.contents), 0, 0, 0, 0.0]]
+    links = 0  # <a> elements currently open
+
+    while stack:
+        entry = stack[-1]
+        for child in entry[1]:
+            if isinstance(child, Tag):
+                if child.name in _STRIP_TAG_SET:
+                    continue
+                if child.name == 'a':
+                    links += 1
+                stack.append([child, iter(child.contents), 0, 0, 0, 0.0])
+                break
+            if type(child) in _TEXT_STRING_TYPES:
+                stripped = child.strip()
+                if stripped:
+                    entry[2] += len(stripped)
+                    entry[4] += stripped.count(',')
+                    if links:
+                        entry[3] += len(stripped)
+        else:
+            tag, _, text, link, commas, credit = stack.pop()
+            if tag.name == 'a':
+                links -= 1
+            if stack:
+                parent = stack[-1]
+                parent[2] += text
+                parent[3] += link
+                parent[4] += commas
+                if tag.name in _DENSITY_BLOCKS and text >= DENSITY_MIN_BLOCK_CHARS:
+                    points = 1 + commas + min(text // 100, 3)
+                    parent[5] += points
+                    if len(stack) > 1:
+                        stack[-2][5] += points / 2
+            if credit:
+                density = 1 - link / text if text else 0
+                scores[id(tag)] = (tag, (credit + _name_weight(tag)) * density)
+
+    return scores
+
+
+class DensityExtractor(SoupExtractor):
+    """
+    BeautifulSoup extraction that picks the content container by text
+    density instead of the CONTENT_SELECTORS list.
+
+    Works on unfamiliar layouts where no selector matches and the <body>
+    fallback would pull in sidebars and comments. The best-scoring
+    element (see _density_scores) and any sibling scoring at least a
+    fifth as much are kept; their CONTENT_TAGS blocks are extracted as
+    usual. Pages where nothing scores fall back to <body>.
+    """
+
+    def extract_from_soup(self, soup, preferred_selector=None, dedup=False):
+        root = soup.body if soup.body is not None and not _is_stripped(soup.body) else None
+        if root is None:
+            return super().extract_from_soup(soup, None, dedup)
+
+        scores = _density_scores(root)
+        if not scores:
+            containers, selector = [root], "body"
+        else:
+            top, best = max(scores.values(), key=lambda item: item[1])
+            containers, selector = [top], "density"
+            if top.parent is not None and best > 0:
+                containers = [
+                    sibling for sibling in top.parent.find_all(True, recursive=False)
+                    if sibling is top or (
+                        sibling.name not in _CONTENT_TAG_SET
+                        and scores.get(id(sibling), (None, 0))[1] >= best / 5
+                    )
+                ]
+
+        blocks = []
+        for container in containers:
+            blocks.extend(_walk_blocks(container, owned=dedup))
+        if dedup:
+            blocks = unique_blocks(blocks)
+        return Extraction(clean_text('\n\n'.join(blocks)), selector)
+
+
+class SelectolaxExtractor(Extractor):
+    """Extraction with selectolax's lexbor engine (a fast C HTML5 parser)."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_class = LexborHTMLParser
+
+    def extract_details(self, html, preferred_selector=None, dedup=False):
+        tree = self._parser_class(html)
+        tree.strip_tags(STRIP_TAGS, recursive=True)
+
+        main_content = None
+        for selector in selector_order(preferred_selector):
+            main_content = tree.css_first(selector)
+            if main_content is not None:
+                break
+        if main_content is None:
+            main_content = tree.body
+            selector = "body" if main_content is not None else None
+
+        if main_content is not None and dedup:
+            blocks = _lexbor_owned_blocks(main_content)
+        elif main_content is not None:
+            wanted = set(CONTENT_TAGS)
+            blocks = []
+            for node in main_content.traverse():
+                # traverse() yields the container itself first; find_all() does not
+                if node.tag in wanted and node is not main_content:
+                    block = node.text(deep=True, separator='', strip=True)
+                    if block:
+                        blocks.append(block)
+        else:
+            blocks = [s for s in tree.root.text(separator='\0', strip=True).split('\0') if s]
+        if dedup:
+            blocks = unique_blocks(blocks)
+
+        return Extraction(clean_text('\n\n'.join(blocks)), selector)
+
+
+def _stream_matcher(selector):
+    """
+    Build a (name, attrs) test for one of the simple selector forms in
+    CONTENT_SELECTORS: tag, .class, #id, [attr] or [attr="value"].
+
+    Raises:
+        ValueError: For any other selector
+    """
+    match = _STREAM_SELECTOR.match(selector)
+    if match is None:
+        raise ValueError(f"The stream engine cannot match selector '{selector}'")
+    if match["tag"]:
+        tag = match["tag"]
+        return lambda name, attrs: name == tag
+    if match["cls"]:
+        cls = match["cls"]
+        return lambda name, attrs: cls in attrs.get("class", "").split()
+    if match["id"]:
+        ident = match["id"]
+        return lambda name, attrs: attrs.get("id") == ident
+    attr, value = match["attr"], match["value"]
+    if value is None:
+        return lambda name, attrs: attr in attrs
+    return lambda name, attrs: attrs.get(attr) == value
+
+
+class _BlockStream(HTMLParser):
+    """
+    Tokenizer half of StreamExtractor.
+
+    Keeps a stack of open element names (closed the way bs4's
+    html.parser builder closes them) and, for each selector, the range
+    of blocks inside the first element it matches. Block texts are
+    written as blocks close; no tree is built.
+    """
+
+    def __init__(self, selectors, owned):
+        super().__init__(convert_charrefs=False)
+        self._matchers = [_stream_matcher(selector) for selector in selectors]
+        self._owned = owned
+        self._stack = []         # (name, block slot, capture keys, string container) per open element
+        self._closed_voids = []  # void elements whose end tag is still to be swallowed
+        self._skip_from = None   # index in _stack of the STRIP_TAGS element being skipped
+        self._hidden = 0         # open template/rt/rp elements, whose strings are not text
+        self._pending = []       # character data since the last markup event
+        self._open_parts = []    # text fragments of the blocks currently open
+        self.blocks = []
+        self.captures = [None] * len(selectors)  # [first block, end block] per selector
+        self.body = None         # [first block, end block] of the first <body>; False if stripped
+        self.strings = []        # every text string, until a usable <body> makes them moot
+        self.done = False        # the first selector's element has closed; nothing else matters
+
+    def _flush(self, text_type=False):
+        """End the current string, as bs4's endData() does at every markup event."""
+        if not self._pending:
+            return
+        data = ''.join(self._pending)
+        self._pending = []
+        if self._skip_from is not None or (self._hidden and not text_type):
+            return
+        stripped = data.strip()
+        if not stripped:
+            return
+        for parts in (self._open_parts[-1:] if self._owned else self._open_parts):
+            parts.append(stripped)
+        if self.strings is not None:
+            self.strings.append(stripped)
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs)
+        if tag in _VOID_TAGS:
+            # Closed straight away; a matching end tag later is ignored
+            # without ending the current string, as bs4 does
+            self._pop_to(tag)
+            self._closed_voids.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs)
+        self._flush()
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_voids:
+            self._closed_voids.remove(tag)
+            return
+        self._flush()
+        self._pop_to(tag)
+
+    def _open(self, tag, attrs):
+        self._flush()
+        if tag == "body" and self.body is None:
+            if self._skip_from is None:
+                self.body = [None, None]
+                self.strings = None
+            else:
+                self.body = False
+        if self._skip_from is None and tag in _STRIP_TAG_SET:
+            self._skip_from = len(self._stack)
+        if self._skip_from is not None:
+            self._stack.append((tag, None, (), False))
+            return
+
+        slot = None
+        if tag in _CONTENT_TAG_SET:
+            slot = len(self.blocks)
+            self.blocks.append(None)
+            self._open_parts.append([])
+
+        keys = []
+        attributes = {}
+        for name, value in attrs:
+            attributes[name] = "" if value is None else value
+        for key, matches in enumerate(self._matchers):
+            if self.captures[key] is None and matches(tag, attributes):
+                self.captures[key] = [len(self.blocks), None]
+                keys.append(key)
+        if self.body and self.body[0] is None:
+            self.body[0] = len(self.blocks)
+            keys.append("body")
+
+        hidden = tag in _STRING_CONTAINER_TAGS
+        if hidden:
+            self._hidden += 1
+        self._stack.append((tag, slot, keys, hidden))
+
+    def _pop_to(self, tag):
+        """Close up to the most recent open element named `tag`, if any."""
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        for entry in reversed(self._stack[i:]):
+            self._close(entry)
+        del self._stack[i:]
+        if self._skip_from is not None and i <= self._skip_from:
+            self._skip_from = None
+
+    def _close(self, entry):
+        _, slot, keys, hidden = entry
+        if slot is not None:
+            self.blocks[slot] = ''.join(self._open_parts.pop())
+        for key in keys:
+            capture = self.body if key == "body" else self.captures[key]
+            capture[1] = len(self.blocks)
+            if key == 0:
+                self.done = True
+        if hidden:
+            self._hidden -= 1
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_charref(self, name):
+        # Converted like bs4's html.parser builder does
+        base, pattern, digits = 10, _DECIMAL_REFERENCE, name
+        if name[:1] in ("x", "X"):
+            base, pattern, digits = 16, _HEX_REFERENCE, name[1:]
+        try:
+            number, extra = int(digits, base), ""
+        except ValueError:
+            match = pattern.search(digits)
+            if match is None:
+                self._pending.append(digits)
+                return
+            number, extra = int(match.group(1), base), match.group(2)
+        self._pending.append(UnicodeDammit.numeric_character_reference(number)[0])
+        self._pending.append(extra)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._pending.append(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._pending.append(data[len("CDATA["):])
+            self._flush(text_type=True)
+
+    def finish(self):
+        """Close every element still open at the end of the document."""
+        self._flush()
+        for entry in reversed(self._stack):
+            self._close(entry)
+        self._stack = []
+
+
+class StreamExtractor(Extractor):
+    """
+    Extraction without building a tree, for very large pages.
+
+    The document is fed in STREAM_CHUNK_CHARS pieces to an incremental
+    tokenizer (the standard library's, as the html.parser backend uses)
+    that tracks only the open element names and collects block texts
+    for the first element each selector matches, and for <body>. Memory
+    grows with the amount of text, not with the size of the tree, and
+    parsing stops as soon as the first-choice container has closed.
+    Elements close exactly as the html.parser tree builder closes them,
+    so the output equals the html.parser backend's.
+    """
+
+    name = "stream"
+
+    def extract_details(self, html, preferred_selector=None, dedup=False):
+        if isinstance(html, bytes):
+            html = UnicodeDammit(html, is_html=True).unicode_markup or ""
+
+        selectors = selector_order(preferred_selector)
+        stream = _BlockStream(selectors, owned=dedup)
+        for start in range(0, len(html), STREAM_CHUNK_CHARS):
+            stream.feed(html[start:start + STREAM_CHUNK_CHARS])
+            if stream.done:
+                break
+        else:
+            stream.close()
+        stream.finish()
+
+        selector = None
+        span = None
+        for key, capture in enumerate(stream.captures):
+            if capture is not None:
+                selector, span = selectors[key], capture
+                break
+        if span is None and stream.body:
+            selector, span = "body", stream.body
+
+        if span is not None:
+            blocks = [block for block in stream.blocks[span[0]:span[1]] if block]
+        else:
+            blocks = stream.strings or []
+        if dedup:
+            blocks = unique_blocks(blocks)
+
+        return Extraction(clean_text('\n\n'.join(blocks)), selector)
+
+
+# Backend name -> zero-argument factory
+EXTRACTORS = {
+    "html.parser": lambda: SoupExtractor("html.parser"),
+    "lxml": lambda: SoupExtractor("lxml"),
+    "selectolax": SelectolaxExtractor,
+    "stream": StreamExtractor,
+}
+
+_instances = {}
+
+
+def get_extractor(name=DEFAULT_PARSER, strained=False, engine="selectors"):
+    """
+    Return the (cached) extractor for a backend name.
+
+    Args:
+        name (str): Backend name, a key of EXTRACTORS
+        strained (bool): Filter the tree while parsing (see StrainedSoup);
+            BeautifulSoup backends only
+        engine (str): How the content container is chosen, one of
+            ENGINES; "density" needs an unfiltered BeautifulSoup backend
+
+    Raises:
+        ValueError: If the backend or engine is unknown, the backend's
+            package is not installed, or it cannot run that way
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown parser backend '{name}' (choose from {', '.join(EXTRACTORS)})")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine}' (choose from {', '.join(ENGINES)})")
+    key = (name, strained, engine)
+    if key not in _instances:
+        try:
+            extractor = EXTRACTORS[name]()
+            if name == "lxml":
+                import lxml  # noqa: F401  (bs4 only fails at parse time otherwise)
+        except ImportError as e:
+            raise ValueError(f"Parser backend '{name}' is not installed ({e})")
+        if strained:
+            if not isinstance(extractor, SoupExtractor):
+                raise ValueError(f"Parse-time filtering needs a BeautifulSoup backend, not '{name}'")
+            extractor = SoupExtractor(extractor.features, strained=True)
+        if engine == "density":
+            if not isinstance(extractor, SoupExtractor) or strained:
+                raise ValueError("The density engine needs a full BeautifulSoup tree "
+                                 "(--parser html.parser or lxml, without --strainer)")
+            extractor = DensityExtractor(extractor.features)
+        _instances[key] = extractor
+    return _instances[key]
+
+
+def extract_page(html, backend=DEFAULT_PARSER, strained=False, preferred_selector=None, min_length=0,
+                 dedup=False, engine="selectors", content_type=None):
+    """
+    Extract one page, trying `preferred_selector` first.
+
+    A bytes page is decoded with decode_html first, so the parser gets
+    text and skips its own charset sniffing. If the preferred selector
+    matches but yields `min_length` characters or fewer, the full
+    selector list is used instead. Takes and returns only picklable
+    values so it can run in a ParsePool worker process.
+
+    Returns:
+        Extraction: The text, the selector used, the seconds taken and
+            how the page was decoded
+    """
+    started = time.perf_counter()
+    decoded = decode_html(html, content_type)
+    decode_seconds = time.perf_counter() - started
+    html = decoded.text
+    extractor = get_extractor(backend, strained, engine)
+    result = extractor.extract_details(html, preferred_selector, dedup)
+    if preferred_selector and result.selector == preferred_selector and len(result.text) <= min_length:
+        result = extractor.extract_details(html, dedup=dedup)
+    return result._replace(
+        seconds=time.perf_counter() - started,
+        decoded=decoded._replace(text=None),
+        decode_seconds=decode_seconds,
+    )
+
+
+class ParsePool:
+    """
+    Worker processes for the CPU-bound parse/extract stage.
+
+    Parsing holds the GIL, so running it in the fetching process stalls
+    network I/O. Pages go to `workers` processes (one per CPU core by
+    default) through extract_page. At most `max_pending` pages may be
+    queued, being parsed, or parsed but not yet collected; submit()
+    blocks beyond that, holding back the fetch stage instead of
+    buffering page bodies without bound.
+    """
+
+    def __init__(self):
+        self.workers = 0
+        self.max_pending = 0
+        self._executor = None
+        self._slots = None
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def start(self, workers=None, max_pending=None):
+        """Start the worker processes (spawned, so no fetch threads are forked)."""
+        self.close()
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def full(self):
+        """True if submit() would block."""
+        if not self._slots.acquire(blocking=False):
+            return True
+        self._slots.release()
+        return False
+
+    def submit(self, html, backend, strained=False, preferred_selector=None, min_length=0, dedup=False,
+               engine="selectors", content_type=None):
+        """
+        Queue a page for extract_page, blocking while the pool is full.
+
+        Returns:
+            concurrent.futures.Future: Resolves to an Extraction; pass it
+                to collect() to free its slot
+        """
+        self._slots.acquire()
+        try:
+            return self._executor.submit(
+                extract_page, html, backend, strained, preferred_selector, min_length, dedup, engine,
+                content_type,
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def collect(self, future):
+        """Wait for a submitted page and free its slot; re-raises worker errors."""
+        try:
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def available_backends():
+    """Names of the backends whose packages are importable."""
+    names = []
+    for name in EXTRACTORS:
+        try:
+            get_extractor(name)
+        except ValueError:
+            continue
+        names.append(name)
+    return names
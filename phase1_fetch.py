@@ -0,0 +1,927 @@
+# Phase 1: network helpers for RoleModelConnect
+# Shared HTTP sessions and robots.txt handling used by phase1_curation
+
+import asyncio
+import random
+import threading
+import time
+import urllib.robotparser as robotparser
+import zlib
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+
+from phase1_store import load_json, save_json
+
+try:
+    import brotli
+except ImportError:  # optional: br is only advertised when it can be decoded
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only advertised when it can be decoded
+    zstandard = None
+
+# Configuration
+ROBOTS_TTL = 24 * 60 * 60  # seconds a cached robots.txt stays valid
+ROBOTS_TIMEOUT = 15  # seconds
+POOL_CONNECTIONS = 10  # number of per-host connection pools kept open
+POOL_MAXSIZE = 10  # keep-alive connections kept per host
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024  # largest page body we will read
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_RETRIES = 3  # extra attempts for a transient failure
+BACKOFF_BASE = 1.0  # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 60.0  # longest wait between attempts, Retry-After included
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BREAKER_THRESHOLD = 5  # consecutive failures that open a host's circuit
+BREAKER_COOLDOWN = 60.0  # seconds before an open circuit lets a probe through
+ADAPTIVE_MIN_DELAY = 0.5  # fastest spacing --adaptive may reach on one host
+ADAPTIVE_MAX_DELAY = 60.0  # slowest spacing after repeated back-offs
+ADAPTIVE_MAX_CONCURRENCY = 4  # most requests in flight to one host
+ADAPTIVE_RATE_STEP = 0.1  # requests/second added after each healthy response
+LATENCY_ALPHA = 0.3  # weight of the newest sample in a host's latency average
+LATENCY_SLOWDOWN = 2.0  # average above this multiple of the host's best = congested
+LATENCY_WARMUP = 3  # responses before latency can trigger a back-off
+BANDWIDTH_REPORT_DOMAINS = 10  # publishers listed in the end-of-run bandwidth report
+
+# Content codings we can decompress, best compression first; sent as Accept-Encoding
+CONTENT_ENCODINGS = (
+    (["zstd"] if zstandard is not None else [])
+    + (["br"] if brotli is not None else [])
+    + ["gzip", "deflate"]
+)
+ACCEPT_ENCODING = ", ".join(CONTENT_ENCODINGS)
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_FEED_BYTES = 64  # zstd input per call; bounds how far one call can inflate
+_DECODE_ERRORS = (
+    (zlib.error,)
+    + ((brotli.error,) if brotli is not None else ())
+    + ((zstandard.ZstdError,) if zstandard is not None else ())
+)
+
+# Query parameters that only track where a click came from; any name
+# starting with one of TRACKING_PREFIXES is dropped too
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "sr", "cmpid", "ocid", "smid", "s_cid", "mbid",
+})
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# A downloaded page, detached from its (already closed) HTTP response
+FetchedPage = namedtuple("FetchedPage", ["url", "status_code", "headers", "content"])
+
+
+def canonicalize_url(url):
+    """
+    Normal form of a URL, used to recognise one page under several spellings.
+
+    Lower-cases the scheme and host, drops default ports, the fragment,
+    tracking parameters and a trailing slash on non-root paths, and
+    sorts the remaining query parameters. Only used as an identity; the
+    URL as given is still what gets fetched.
+
+    Args:
+        url (str): URL to normalise
+
+    Returns:
+        str: The canonical URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+class FetchAborted(Exception):
+    """
+    Raised when a response is rejected before or while its body is read.
+
+    read_body sets `wire_bytes` and `decoded_bytes` to what had been
+    read when it gave up, so the transfer can still be accounted for.
+    """
+
+    wire_bytes = 0
+    decoded_bytes = 0
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for a response's Content-Encoding.
+
+    Takes the body exactly as it came off the wire and decompresses it
+    chunk by chunk, so the compressed size is known and no compressed
+    copy of the page is buffered. Stacked codings ("gzip, br") are
+    undone in reverse order; multi-member gzip streams and raw deflate
+    (sent by some servers as "deflate") are handled, and bytes after
+    the last gzip member are ignored as they are by urllib3.
+
+    Every coding's output is capped at `max_bytes` as it is produced
+    (zlib's max_length, brotli's output_buffer_limit, small zstd input
+    slices), so a small, highly compressed body cannot inflate far past
+    the limit before it is rejected. Brotli < 1.2 has no output limit;
+    its output is checked against the cap after each chunk instead.
+    """
+
+    def __init__(self, content_encoding="", max_bytes=0):
+        codings = [c.strip().lower() for c in (content_encoding or "").split(",")]
+        codings = ["gzip" if c == "x-gzip" else c for c in codings if c and c != "identity"]
+        for coding in codings:
+            if coding not in CONTENT_ENCODINGS:
+                raise FetchAborted(f"content encoding '{coding}' is not supported")
+        self.max_bytes = max_bytes or 0
+        self._codings = codings[::-1]
+        self._states = [self._new_state(c) for c in self._codings]
+        self._produced = [0] * len(self._codings)
+
+    @staticmethod
+    def _new_state(coding):
+        if coding == "gzip":
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if coding == "deflate":
+            return {"obj": zlib.decompressobj(), "raw": None}  # zlib wrapper or raw deflate
+        if coding == "br":
+            return brotli.Decompressor()
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    def _step(self, i, data, limit):
+        """Output of coding `i` for `data`, at most `limit` bytes (0 for no limit)."""
+        coding, state = self._codings[i], self._states[i]
+        if state is None:
+            return b""  # trailing bytes after the last gzip member
+        if coding == "gzip":
+            out = bytearray()
+            while data:
+                if state.eof:  # the member ended: next member or trailing bytes
+                    if not GZIP_MAGIC.startswith(data[:len(GZIP_MAGIC)]):
+                        self._states[i] = None
+                        break
+                    state = self._states[i] = self._new_state("gzip")
+                out += state.decompress(data, limit - len(out) if limit else 0)
+                if not state.eof or (limit and len(out) >= limit):
+                    break
+                data = state.unused_data
+            return bytes(out)
+        if coding == "deflate":
+            if state["raw"] is None:
+                try:
+                    out = state["obj"].decompress(data, limit)
+                    state["raw"] = False
+                    return out
+                except zlib.error:
+                    state["obj"] = zlib.decompressobj(-zlib.MAX_WBITS)
+                    state["raw"] = True
+            return state["obj"].decompress(data, limit)
+        if coding == "br":
+            if limit:
+                try:
+                    return state.process(data, output_buffer_limit=limit)
+                except TypeError:  # Brotli < 1.2 cannot cap the output of one call
+                    pass
+            return state.process(data)
+        out = bytearray()
+        for start in range(0, len(data), ZSTD_FEED_BYTES):
+            out += state.decompress(data[start:start + ZSTD_FEED_BYTES])
+            if limit and len(out) >= limit:
+                break
+        return bytes(out)
+
+    def decompress(self, data):
+        """
+        Decoded bytes for the next chunk of wire data (may be empty).
+
+        Raises:
+            FetchAborted: If the data cannot be decoded or a coding's
+                output grows past `max_bytes`
+        """
+        try:
+            for i in range(len(self._codings)):
+                if not data:
+                    return b""
+                limit = self.max_bytes - self._produced[i] + 1 if self.max_bytes else 0
+                data = self._step(i, data, limit)
+                self._produced[i] += len(data)
+                if self.max_bytes and self._produced[i] > self.max_bytes:
+                    raise FetchAborted(f"body exceeds the {self.max_bytes}-byte limit")
+        except _DECODE_ERRORS as e:
+            raise FetchAborted(f"could not decode the response body: {e}") from e
+        return data
+
+
+def _raw_chunks(response, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    The body exactly as received, in chunks of at most `chunk_size` bytes.
+
+    urllib3 errors are re-raised as the requests exceptions
+    Response.iter_content would raise, so a dropped connection or a read
+    timeout mid-body is retried like any other transient failure.
+    """
+    try:
+        yield from response.raw.stream(chunk_size, decode_content=False)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e) from e
+    except DecodeError as e:
+        raise requests.exceptions.ContentDecodingError(e) from e
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e) from e
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e) from e
+
+
+def read_body(response, max_bytes=MAX_RESPONSE_BYTES, allowed_types=ALLOWED_CONTENT_TYPES):
+    """
+    Stream a response body while enforcing type and size limits.
+
+    The Content-Type and Content-Length headers are checked before any
+    of the body is read. The raw (still compressed) stream is read in
+    chunks and decompressed as it arrives by a StreamDecoder whose
+    output is capped, and the download is abandoned as soon as the
+    decoded body grows past `max_bytes`, so memory per fetch stays
+    bounded.
+
+    Args:
+        response (requests.Response): A response opened with stream=True
+        max_bytes (int): Maximum decoded body size in bytes (0 or None for no limit)
+        allowed_types (tuple): Accepted MIME types (empty for any). A
+            missing Content-Type header is accepted.
+
+    Returns:
+        tuple: (body, wire_bytes) - the decoded body and the number of
+            bytes received for it before decompression
+
+    Raises:
+        FetchAborted: If the type or encoding is not allowed or the body
+            is too large, carrying the bytes read so far
+    """
+    mime_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if mime_type and allowed_types and mime_type not in allowed_types:
+        raise FetchAborted(f"content type '{mime_type}' is not allowed")
+
+    length = response.headers.get("Content-Length", "")
+    if max_bytes and length.isdigit() and int(length) > max_bytes:
+        raise FetchAborted(f"Content-Length {length} exceeds the {max_bytes}-byte limit")
+
+    decoder = StreamDecoder(response.headers.get("Content-Encoding", ""), max_bytes)
+    body = bytearray()
+    wire_bytes = 0
+    try:
+        for chunk in _raw_chunks(response):
+            wire_bytes += len(chunk)
+            body += decoder.decompress(chunk)
+            if max_bytes and len(body) > max_bytes:
+                raise FetchAborted(f"body exceeds the {max_bytes}-byte limit")
+    except FetchAborted as e:
+        e.wire_bytes, e.decoded_bytes = wire_bytes, len(body)
+        raise
+    return bytes(body), wire_bytes
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait according to a Retry-After header.
+
+    Accepts both forms the header can take: a number of seconds or an
+    HTTP date.
+
+    Returns:
+        float: Seconds from now (never negative), or None if missing/invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed fetch.
+
+    Connection errors, timeouts and RETRY_STATUSES responses are
+    transient and retried up to `retries` times. Waits use exponential
+    backoff with full jitter (uniform between 0 and base * 2**attempt,
+    capped at `max_delay`), so retries against one host spread out. A
+    Retry-After header replaces the computed wait; one asking for more
+    than `max_delay` is not retried.
+    """
+
+    def __init__(self, retries=MAX_RETRIES, base=BACKOFF_BASE, max_delay=BACKOFF_MAX,
+                 statuses=RETRY_STATUSES):
+        self.retries = retries
+        self.base = base
+        self.max_delay = max_delay
+        self.statuses = statuses
+
+    def configure(self, retries=None, base=None):
+        """Set the number of retries and/or the backoff base."""
+        if retries is not None:
+            self.retries = retries
+        if base is not None:
+            self.base = base
+
+    def is_transient(self, error):
+        """True if a requests exception is worth retrying."""
+        if isinstance(error, requests.exceptions.HTTPError):
+            response = error.response
+            return response is not None and response.status_code in self.statuses
+        return isinstance(error, (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ))
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retry number `attempt + 1`.
+
+        Args:
+            attempt (int): Retries already made for this URL
+            retry_after (float): Wait requested by the server, if any
+
+        Returns:
+            float: The wait, or None if the URL should not be retried
+        """
+        if attempt >= self.retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base * 2 ** attempt))
+
+
+RETRY_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After `threshold` consecutive failures (connection errors, timeouts,
+    429/5xx) a host's circuit opens and its URLs fail immediately
+    instead of each waiting out a timeout. Once `cooldown` seconds have
+    passed a single probe request is let through: success closes the
+    circuit, failure opens it for another cooldown. A threshold of 0
+    disables the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.trips = 0
+        self.short_circuited = 0
+        self._hosts = {}  # host -> {"state", "failures", "opened_at"}
+        self._lock = threading.Lock()
+
+    def configure(self, threshold=None, cooldown=None):
+        """Set the failure threshold and/or cooldown."""
+        if threshold is not None:
+            self.threshold = threshold
+        if cooldown is not None:
+            self.cooldown = cooldown
+
+    @staticmethod
+    def host_for(url):
+        return urlparse(url).netloc.lower()
+
+    def allow(self, url):
+        """
+        Whether a request to the URL's host may be sent now.
+
+        An open circuit whose cooldown has passed becomes half-open and
+        admits exactly one probe.
+        """
+        if not self.threshold:
+            return True
+        with self._lock:
+            entry = self._hosts.get(self.host_for(url))
+            if entry is None or entry["state"] == self.CLOSED:
+                return True
+            if entry["state"] == self.OPEN and time.monotonic() - entry["opened_at"] >= self.cooldown:
+                entry["state"] = self.HALF_OPEN
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self, url):
+        """The host answered: close its circuit."""
+        with self._lock:
+            self._hosts.pop(self.host_for(url), None)
+
+    def abandon(self, url):
+        """
+        A request ended without telling whether the host is healthy.
+
+        If it was the half-open probe, the circuit opens again for a
+        fresh cooldown so a later request can probe; otherwise the host
+        would stay half-open, failing fast, for the rest of the run.
+        """
+        with self._lock:
+            entry = self._hosts.get(self.host_for(url))
+            if entry is not None and entry["state"] == self.HALF_OPEN:
+                entry["state"] = self.OPEN
+                entry["opened_at"] = time.monotonic()
+
+    def record_failure(self, url):
+        """
+        Count a failed request against the URL's host.
+
+        Returns:
+            bool: True if this failure opened the circuit
+        """
+        if not self.threshold:
+            return False
+        with self._lock:
+            entry = self._hosts.setdefault(
+                self.host_for(url), {"state": self.CLOSED, "failures": 0, "opened_at": 0.0}
+            )
+            entry["failures"] += 1
+            if entry["state"] == self.OPEN:
+                return False
+            if entry["state"] == self.HALF_OPEN or entry["failures"] >= self.threshold:
+                entry["state"] = self.OPEN
+                entry["opened_at"] = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+    def report(self):
+        """Print how often circuits opened and how many requests they saved."""
+        print(f"Circuit breaker: opened {self.trips} times, "
+              f"{self.short_circuited} requests failed fast")
+
+
+BREAKERS = CircuitBreaker()
+
+
+class BandwidthLedger:
+    """
+    Per-domain transfer accounting for one run.
+
+    For every page fetched (including downloads abandoned part way),
+    records the bytes received on the wire (before decompression) and
+    the decoded body size; once a page's text is saved, the kept text
+    size is added too. The report ranks
+    publishers by wire bytes and shows how many wire bytes each kept
+    byte of text cost, which is where a crawl's bandwidth goes.
+    """
+
+    def __init__(self):
+        self._domains = {}  # domain -> {"pages", "wire", "decoded", "kept"}
+        self._pending = {}  # url -> domain, fetched but not yet saved or skipped
+        self._lock = threading.Lock()
+
+    def record(self, url, wire_bytes, decoded_bytes):
+        """Count one downloaded response body."""
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            entry = self._domains.setdefault(
+                domain, {"pages": 0, "wire": 0, "decoded": 0, "kept": 0}
+            )
+            entry["pages"] += 1
+            entry["wire"] += wire_bytes
+            entry["decoded"] += decoded_bytes
+            self._pending[url] = domain
+
+    def record_kept(self, url, kept_bytes):
+        """
+        Count the text saved from a page fetched this run.
+
+        Pages replayed from the archive were not downloaded, so their
+        text is not counted against any publisher.
+        """
+        with self._lock:
+            domain = self._pending.pop(url, None)
+            if domain is not None:
+                self._domains[domain]["kept"] += kept_bytes
+
+    def discard(self, url):
+        """Forget a fetched page that will not be saved (nothing was kept)."""
+        with self._lock:
+            self._pending.pop(url, None)
+
+    @staticmethod
+    def _size(n):
+        for unit in ("B", "KB", "MB"):
+            if n < 1024:
+                return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+            n /= 1024
+        return f"{n:.1f} GB"
+
+    def report(self, limit=BANDWIDTH_REPORT_DOMAINS):
+        """Print run totals and the publishers that cost the most bandwidth."""
+        with self._lock:
+            domains = sorted(self._domains.items(), key=lambda item: -item[1]["wire"])
+        if not domains:
+            return
+        wire = sum(entry["wire"] for _, entry in domains)
+        decoded = sum(entry["decoded"] for _, entry in domains)
+        kept = sum(entry["kept"] for _, entry in domains)
+        print(f"Bandwidth: {self._size(wire)} on the wire, {self._size(decoded)} decoded, "
+              f"{self._size(kept)} of text kept")
+        for domain, entry in domains[:limit]:
+            cost = f"{entry['wire'] / entry['kept']:.1f} wire bytes per kept byte" if entry["kept"] else "nothing kept"
+            print(f"  {domain}: {entry['pages']} pages, {self._size(entry['wire'])} wire, "
+                  f"{self._size(entry['decoded'])} decoded, {self._size(entry['kept'])} kept ({cost})")
+
+
+BANDWIDTH = BandwidthLedger()
+
+
+class SessionPool:
+    """
+    Shared keep-alive HTTP session for the whole run.
+
+    A single `requests.Session` is mounted with an HTTPAdapter whose
+    urllib3 pool manager keeps one connection pool per host, so the
+    robots.txt check and every page fetch on that host reuse the same
+    TCP/TLS connections instead of opening new ones.
+    """
+
+    def __init__(self, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._lock = threading.Lock()
+
+    def configure(self, pool_connections=None, pool_maxsize=None):
+        """Set pool sizes. Takes effect for the next session created."""
+        if pool_connections is not None:
+            self.pool_connections = pool_connections
+        if pool_maxsize is not None:
+            self.pool_maxsize = pool_maxsize
+
+    def get(self):
+        """Return the shared session, creating it on first use."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def close(self):
+        """Close all pooled connections. A later get() starts a new session."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+SESSIONS = SessionPool()
+
+
+class RobotsCache:
+    """
+    Process-wide robots.txt cache keyed by scheme and host.
+
+    Every outcome is cached for `ttl` seconds, including hosts whose
+    robots.txt could not be downloaded, so each host costs at most one
+    robots.txt round trip per TTL. When `path` is set the cache is
+    loaded from and saved to that JSON file, letting repeated runs skip
+    the download entirely.
+    """
+
+    # Entry statuses, mirroring RobotFileParser.read()
+    PARSED = "parsed"              # robots.txt downloaded and parsed
+    ALLOW_ALL = "allow_all"        # 4xx other than 401/403
+    DISALLOW_ALL = "disallow_all"  # 401/403
+    SERVER_ERROR = "server_error"  # 5xx: RobotFileParser refuses every URL
+    UNREACHABLE = "unreachable"    # network error: we proceed cautiously
+
+    def __init__(self, ttl=ROBOTS_TTL, path=None):
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._parsers = {}
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def configure(self, ttl=None, path=None):
+        """Set the TTL and/or persistence file, loading any saved entries."""
+        if ttl is not None:
+            self.ttl = ttl
+        if path:
+            self.path = path
+            saved = load_json(path, default={})
+            with self._lock:
+                self._entries.update(saved)
+                self._parsers.clear()
+
+    @staticmethod
+    def key_for(url):
+        """Cache key for a URL: scheme plus host (including port)."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+    def lookup(self, url):
+        """
+        Return the cached robots.txt entry for the URL's host.
+
+        Downloads robots.txt on a miss or when the entry is older than
+        the TTL. Concurrent lookups for one host share a single download.
+
+        Returns:
+            tuple: (status, RobotFileParser)
+        """
+        key = self.key_for(url)
+        with self._lock:
+            host_lock = self._host_locks.setdefault(key, threading.Lock())
+
+        with host_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and time.time() - entry["fetched_at"] < self.ttl:
+                    self.hits += 1
+                    parser = self._parsers.get(key)
+                    if parser is None:
+                        parser = self._parsers[key] = self._build_parser(key, entry)
+                    return entry["status"], parser
+                self.misses += 1
+
+            entry = self._download(key)
+            parser = self._build_parser(key, entry)
+            with self._lock:
+                self._entries[key] = entry
+                self._parsers[key] = parser
+            return entry["status"], parser
+
+    def _download(self, key):
+        """Fetch robots.txt for one host and describe the outcome."""
+        entry = {"fetched_at": time.time(), "status": self.PARSED, "lines": []}
+        try:
+            response = SESSIONS.get().get(f"{key}/robots.txt", timeout=ROBOTS_TIMEOUT)
+        except Exception:
+            entry["status"] = self.UNREACHABLE
+            BREAKERS.record_failure(key)
+            return entry
+
+        if response.status_code in (401, 403):
+            entry["status"] = self.DISALLOW_ALL
+        elif 400 <= response.status_code < 500:
+            entry["status"] = self.ALLOW_ALL
+        elif response.status_code >= 500:
+            entry["status"] = self.SERVER_ERROR
+        else:
+            try:
+                entry["lines"] = response.content.decode("utf-8").splitlines()
+            except UnicodeDecodeError:
+                entry["status"] = self.UNREACHABLE
+        return entry
+
+    @staticmethod
+    def _build_parser(key, entry):
+        """Rebuild a RobotFileParser from a cached entry."""
+        parser = robotparser.RobotFileParser(f"{key}/robots.txt")
+        status = entry["status"]
+        if status == RobotsCache.PARSED:
+            parser.parse(entry["lines"])
+        elif status == RobotsCache.DISALLOW_ALL:
+            parser.disallow_all = True
+        elif status == RobotsCache.ALLOW_ALL:
+            parser.allow_all = True
+        return parser
+
+    def crawl_delay(self, url, user_agent):
+        """
+        Crawl-delay for the URL's host from an already cached robots.txt.
+
+        Never downloads anything and does not count as a hit or miss.
+
+        Returns:
+            float: The Crawl-delay in seconds, or None if unknown/unset
+        """
+        key = self.key_for(url)
+        with self._lock:
+            parser = self._parsers.get(key)
+        if parser is None:
+            return None
+        delay = parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+
+    def save(self):
+        """Persist the cache to `path`, if one was configured."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        save_json(self.path, snapshot)
+
+    def report(self):
+        """Print hit/miss counts for this run."""
+        total = self.hits + self.misses
+        print(f"robots.txt cache: {self.hits} hits, {self.misses} misses "
+              f"({self.hits}/{total} robots.txt downloads saved)")
+
+
+ROBOTS_CACHE = RobotsCache()
+
+
+class PolitenessScheduler:
+    """
+    Per-domain token-bucket rate limiter.
+
+    Each domain gets a bucket holding up to `burst` tokens that refills
+    at one token per interval. The interval is the domain's robots.txt
+    Crawl-delay when one is cached in `robots`, otherwise
+    `default_delay`. A request only waits when its own domain's bucket
+    is empty, so requests to other domains are never held up.
+
+    In adaptive mode each domain's request rate and allowed concurrency
+    follow AIMD (additive increase, multiplicative decrease) driven by
+    observe(): every healthy response adds ADAPTIVE_RATE_STEP
+    requests/second and about one concurrent request per window, while
+    a 429/5xx, a timeout or a latency average above LATENCY_SLOWDOWN
+    times the host's best halves both. A robots.txt Crawl-delay is
+    always respected as the minimum interval and limits the host to one
+    request at a time.
+    """
+
+    def __init__(self, default_delay, user_agent, robots=ROBOTS_CACHE, burst=1):
+        self.default_delay = default_delay
+        self.user_agent = user_agent
+        self.robots = robots
+        self.burst = burst
+        self.adaptive = False
+        self.min_delay = ADAPTIVE_MIN_DELAY
+        self.max_concurrency = ADAPTIVE_MAX_CONCURRENCY
+        self._buckets = {}  # domain -> [tokens, last refill time]
+        self._hosts = {}  # domain -> adaptive state, see observe()
+        self._lock = threading.Lock()
+
+    def configure(self, adaptive=None, min_delay=None, max_concurrency=None):
+        """Turn adaptive mode on or off and set its limits."""
+        if adaptive is not None:
+            self.adaptive = adaptive
+        if min_delay is not None:
+            self.min_delay = min_delay
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+
+    @staticmethod
+    def domain_for(url):
+        """Bucket key for a URL."""
+        return urlparse(url).netloc.lower()
+
+    def _crawl_delay(self, url):
+        return self.robots.crawl_delay(url, self.user_agent) if self.robots else None
+
+    def interval_for(self, url):
+        """Seconds between requests to the URL's domain."""
+        delay = self._crawl_delay(url)
+        if not self.adaptive:
+            return delay if delay is not None else self.default_delay
+        state = self._hosts.get(self.domain_for(url))
+        interval = 1 / state["rate"] if state else self.default_delay
+        return max(interval, delay) if delay is not None else interval
+
+    def concurrency_for(self, url):
+        """Requests allowed in flight to the URL's domain at once."""
+        if not self.adaptive or self._crawl_delay(url) is not None:
+            return 1
+        state = self._hosts.get(self.domain_for(url))
+        return int(state["concurrency"]) if state else 1
+
+    def observe(self, url, latency=None, failed=False):
+        """
+        Feed one request outcome into the domain's adaptive limits.
+
+        Args:
+            url (str): URL that was requested
+            latency (float): Seconds until the response headers arrived
+            failed (bool): True for a timeout, connection error, 429 or 5xx
+        """
+        if not self.adaptive:
+            return
+        with self._lock:
+            state = self._hosts.setdefault(self.domain_for(url), {
+                "rate": 1 / self.default_delay if self.default_delay > 0 else 1 / self.min_delay,
+                "concurrency": 1.0,
+                "latency": None,
+                "best": None,
+                "responses": 0,
+                "backoffs": 0,
+            })
+            state["url"] = url
+            congested = failed
+            if latency is not None:
+                state["responses"] += 1
+                average = state["latency"]
+                average = latency if average is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * average
+                )
+                state["latency"] = average
+                state["best"] = average if state["best"] is None else min(state["best"], average)
+                if state["responses"] > LATENCY_WARMUP and average > LATENCY_SLOWDOWN * state["best"]:
+                    congested = True
+
+            if congested:
+                state["rate"] = max(1 / ADAPTIVE_MAX_DELAY, state["rate"] / 2)
+                state["concurrency"] = max(1.0, state["concurrency"] / 2)
+                state["backoffs"] += 1
+            else:
+                state["rate"] = min(1 / self.min_delay, state["rate"] + ADAPTIVE_RATE_STEP)
+                state["concurrency"] = min(
+                    self.max_concurrency, state["concurrency"] + 1 / state["concurrency"]
+                )
+
+    def report(self):
+        """Print the limits adaptive mode settled on for each domain."""
+        if not self.adaptive:
+            return
+        with self._lock:
+            hosts = sorted(self._hosts.items())
+        for domain, state in hosts:
+            url = state["url"]
+            latency = f"{1000 * state['latency']:.0f} ms" if state["latency"] is not None else "n/a"
+            print(f"Adaptive limits for {domain}: {1 / self.interval_for(url):.2f} requests/s, "
+                  f"{self.concurrency_for(url)} in flight, latency {latency}, "
+                  f"{state['backoffs']} back-offs")
+
+    def _refill(self, domain, interval, now):
+        bucket = self._buckets.setdefault(domain, [float(self.burst), now])
+        if interval > 0:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) / interval)
+        else:
+            bucket[0] = float(self.burst)
+        bucket[1] = now
+        return bucket
+
+    def ready_at(self, url):
+        """time.monotonic() timestamp when the URL's domain has a token."""
+        interval = self.interval_for(url)
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get(self.domain_for(url))
+            if bucket is None or interval <= 0:
+                return now
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) / interval)
+            return bucket[1] + (1 - bucket[0]) * interval if tokens < 1 else now
+
+    def reserve(self, url):
+        """
+        Take a token for the URL's domain.
+
+        When the bucket is empty the token is borrowed, so concurrent
+        callers queue up behind each other.
+
+        Returns:
+            float: Seconds the caller must wait before sending the request
+        """
+        interval = self.interval_for(url)
+        with self._lock:
+            bucket = self._refill(self.domain_for(url), interval, time.monotonic())
+            wait = max(0.0, (1 - bucket[0]) * interval)
+            bucket[0] -= 1
+            return wait
+
+    def acquire(self, url):
+        """Block until a request to the URL's domain is allowed."""
+        wait = self.reserve(url)
+        if wait > 0:
+            print(f"  Waiting {wait:.1f} seconds before next request to {self.domain_for(url)}...")
+            time.sleep(wait)
+
+    async def acquire_async(self, url):
+        """Asyncio variant of acquire()."""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,910 @@
+# Phase 1: on-disk state helpers for RoleModelConnect
+# Small persistence utilities shared by the crawl caches in phase1_curation
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to gzip for archived pages
+    zstandard = None
+
+
+def load_json(path, default=None):
+    """
+    Load a JSON state file.
+
+    Args:
+        path (str): File to read
+        default: Value returned when the file is missing or unreadable
+
+    Returns:
+        The decoded JSON document, or `default`
+    """
+    if not path or not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  ⚠ Could not read state file {path}: {e}. Starting fresh.")
+        return default
+
+
+def save_json(path, data):
+    """
+    Write a JSON state file atomically (write to a temp file, then rename).
+
+    Args:
+        path (str): Destination file
+        data: JSON-serialisable document
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class CrawlJournal:
+    """
+    Append-only JSONL journal of per-URL outcomes for one crawl.
+
+    Each line records the role model, source index, URL and outcome
+    (`saved`, `not_modified`, `robots`, `too_short`, `duplicate`,
+    `near_duplicate`, `negative_cache` or `error`) plus the saved file
+    path. A fresh run truncates the journal; a resumed run loads it and
+    keeps appending, so `is_done()` can skip URLs that already reached a
+    final outcome. Errors are not final and are retried on resume.
+
+    `fetched` is not final either: it marks a source whose page was
+    downloaded and whose text is held for the duplicate checks, so
+    `is_fetched()` lets a resumed run rebuild it from the raw archive
+    instead of downloading it again.
+    """
+
+    DONE_OUTCOMES = {
+        "saved", "not_modified", "robots", "too_short", "duplicate", "near_duplicate", "negative_cache",
+    }
+
+    def __init__(self):
+        self.path = None
+        self._file = None
+        self._done = {}
+        self._fetched = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(role_model_name, index, url):
+        return f"{role_model_name}\t{index}\t{url}"
+
+    def open(self, path, resume=False):
+        """
+        Start journaling to `path`.
+
+        Args:
+            path (str): Journal file
+            resume (bool): Load existing entries and append instead of truncating
+        """
+        self.close()
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._done = {}
+        self._fetched = set()
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    key = self._key(entry["role_model"], entry["index"], entry["url"])
+                    if entry["outcome"] in self.DONE_OUTCOMES:
+                        self._done[key] = entry["path"]
+                    else:
+                        self._done.pop(key, None)
+                    if entry["outcome"] == "fetched":
+                        self._fetched.add(key)
+                    else:
+                        self._fetched.discard(key)
+            print(f"Resuming: {len(self._done)} URLs already completed in {path}"
+                  + (f", {len(self._fetched)} fetched but not yet saved" if self._fetched else ""))
+
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def is_done(self, role_model_name, index, url):
+        """True if this source already reached a final outcome."""
+        return self._key(role_model_name, index, url) in self._done
+
+    def is_fetched(self, role_model_name, index, url):
+        """True if this source was downloaded but had no final outcome yet."""
+        return self._key(role_model_name, index, url) in self._fetched
+
+    def record(self, role_model_name, index, url, outcome, filepath=None):
+        """Append one outcome and flush it to disk immediately."""
+        if self._file is None:
+            return
+        entry = {
+            "role_model": role_model_name,
+            "index": index,
+            "url": url,
+            "outcome": outcome,
+            "path": filepath,
+            "time": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if outcome in self.DONE_OUTCOMES:
+                self._done[self._key(role_model_name, index, url)] = filepath
+
+    def close(self):
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RawArchive:
+    """
+    Content-addressed store of fetched response bodies.
+
+    Bodies are compressed (zstd when the `zstandard` package is
+    installed, gzip otherwise) and written once under
+    `objects/<hash[:2]>/<hash>` keyed by their SHA-256, so identical
+    pages are stored a single time. `index.jsonl` is an append-only log
+    mapping each URL to its latest hash, fetch time, status and response
+    headers; it lets --replay re-run extraction without any network access.
+    """
+
+    def __init__(self):
+        self.folder = None
+        self._index = {}
+        self._index_file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.folder is not None
+
+    def open(self, folder):
+        """Start archiving into `folder`, loading its existing index."""
+        self.close()
+        self.folder = folder
+        os.makedirs(os.path.join(folder, "objects"), exist_ok=True)
+        index_path = os.path.join(folder, "index.jsonl")
+        self._index = {}
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._index[entry["url"]] = entry
+        self._index_file = open(index_path, 'a', encoding='utf-8')
+
+    def _object_path(self, digest, codec):
+        return os.path.join(self.folder, "objects", digest[:2], f"{digest}.{codec}")
+
+    def put(self, url, body, headers=None, status=200):
+        """
+        Store a response body (once per distinct content) and index the URL.
+
+        Args:
+            url (str): URL the body was fetched from
+            body (bytes): Raw response body
+            headers (Mapping): Response headers to keep in the index
+            status (int): HTTP status code
+
+        Returns:
+            str: SHA-256 hex digest of the body, or None if archiving is off
+        """
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(body).hexdigest()
+        codec = "zst" if zstandard else "gz"
+        path = self._object_path(digest, codec)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if codec == "zst":
+                data = zstandard.ZstdCompressor().compress(body)
+            else:
+                data = gzip.compress(body)
+            tmp_path = f"{path}.tmp.{threading.get_ident()}"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "codec": codec,
+            "status": status,
+            "fetched_at": time.time(),
+            "headers": dict(headers or {}),
+        }
+        with self._lock:
+            self._index[url] = entry
+            self._index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index_file.flush()
+        return digest
+
+    def urls(self):
+        """Every URL with an archived body."""
+        return list(self._index)
+
+    def lookup(self, url):
+        """Latest index entry for a URL, or None."""
+        return self._index.get(url)
+
+    def get(self, url):
+        """
+        Load the archived body for a URL.
+
+        Returns:
+            tuple: (body bytes, index entry), or None if not archived
+        """
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        path = self._object_path(entry["sha256"], entry["codec"])
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if entry["codec"] == "zst":
+            if zstandard is None:
+                raise RuntimeError("Archive object is zstd-compressed: pip install zstandard")
+            body = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            body = gzip.decompress(data)
+        return body, entry
+
+    def close(self):
+        """Close the index file."""
+        with self._lock:
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+
+
+class ValidatorStore:
+    """
+    Per-URL HTTP cache validators for conditional re-crawls.
+
+    Remembers the `ETag` and `Last-Modified` headers of each saved page
+    together with the raw text file it produced. On a later run the
+    fetch layer sends `If-None-Match` / `If-Modified-Since`, and a
+    `304 Not Modified` answer means the existing raw file is still valid.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def open(self, path):
+        """Load validators from `path` (a JSON file)."""
+        self.path = path
+        self._entries = load_json(path, default={})
+
+    def conditional_headers(self, url, filepath):
+        """
+        Request headers that make the fetch of `url` conditional.
+
+        Only returned when the raw file the URL would be saved to is the
+        one recorded with the validators and it still exists on disk.
+
+        Returns:
+            dict: Conditional headers (empty if a full fetch is needed)
+        """
+        entry = self._entries.get(url)
+        if not entry or entry.get("path") != filepath or not os.path.exists(filepath):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, headers, filepath):
+        """Record the validators a response carried for the file it was saved to."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        with self._lock:
+            if etag or last_modified:
+                self._entries[url] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "path": filepath,
+                }
+            else:
+                self._entries.pop(url, None)
+
+    def save(self):
+        """Persist validators to `path`, if one was opened."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        save_json(self.path, snapshot)
+
+
+class SelectorCache:
+    """
+    Per-domain memory of which content selector produced accepted text.
+
+    Pages from one publisher share a layout, so the selector that worked
+    last time is tried first. A hit is a page where the cached selector
+    matched and its text was accepted; anything else is a miss, after
+    which extraction falls back to the full selector list and the cache
+    learns whatever selector worked instead.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._domains = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def open(self, path):
+        """Load the cache from `path` (a JSON file)."""
+        self.path = path
+        self._domains = load_json(path, default={})
+
+    def preferred(self, domain):
+        """Selector to try first for `domain`, or None."""
+        entry = self._domains.get(domain)
+        return entry["selector"] if entry else None
+
+    def record(self, domain, preferred, used, accepted):
+        """
+        Update the cache after extracting one page.
+
+        Args:
+            domain (str): The page's domain
+            preferred (str): Selector that was tried first (or None)
+            used (str): Selector that finally produced the text
+            accepted (bool): Whether the text passed the content check
+        """
+        with self._lock:
+            entry = self._domains.setdefault(domain, {"selector": None, "hits": 0, "misses": 0})
+            if preferred and preferred == used and accepted:
+                entry["hits"] += 1
+                self.hits += 1
+                return
+            if preferred:
+                entry["misses"] += 1
+                self.misses += 1
+            if accepted and used not in (None, "body"):
+                entry["selector"] = used
+            elif entry["selector"] == preferred:
+                entry["selector"] = None
+            if entry["selector"] is None and not entry["hits"] and not entry["misses"]:
+                del self._domains[domain]
+
+    def save(self):
+        """Persist the cache to `path`, if one was opened."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._domains)
+        save_json(self.path, snapshot)
+
+    def report(self):
+        """Print this run's hit rate."""
+        total = self.hits + self.misses
+        rate = f"{100 * self.hits / total:.0f}%" if total else "n/a"
+        print(f"Selector cache: {self.hits} hits, {self.misses} misses (hit rate {rate}, "
+              f"{len(self._domains)} domains known)")
+
+
+BOILERPLATE_MIN_PAGES = 5  # pages a domain needs before anything is dropped
+BOILERPLATE_SHARE = 0.5  # fraction of a domain's pages a boilerplate paragraph is on
+BOILERPLATE_MAX_TRACKED = 20000  # paragraph counts kept per domain before pruning
+
+
+def paragraph_key(paragraph):
+    """Hash of a paragraph with case, punctuation and spacing normalised away."""
+    normalized = " ".join(_WORD.findall(paragraph.lower()))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class BoilerplateTable:
+    """
+    Per-domain counts of how many pages each paragraph appears on.
+
+    Newsletter prompts, "Advertisement" lines and related-story blurbs
+    repeat on every page of a publisher while article text does not.
+    Once a domain has `min_pages` pages, a paragraph found on at least
+    `share` of them is boilerplate and dropped. Each URL is counted
+    once, so re-crawling an article never makes it look repeated. When
+    a domain tracks more than BOILERPLATE_MAX_TRACKED paragraphs, the
+    ones seen on a single page are forgotten.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.min_pages = BOILERPLATE_MIN_PAGES
+        self.share = BOILERPLATE_SHARE
+        self._domains = {}  # domain -> {"urls": [url keys], "counts": {paragraph key: pages}}
+        self._urls = {}  # domain -> set of url keys, mirrors "urls"
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.dropped = 0
+        self.dropped_chars = 0
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def open(self, path, min_pages=BOILERPLATE_MIN_PAGES, share=BOILERPLATE_SHARE):
+        """Load the table from `path` (a JSON file)."""
+        self.path = path
+        self.min_pages = min_pages
+        self.share = share
+        self._domains = load_json(path, default={})
+        self._urls = {domain: set(entry["urls"]) for domain, entry in self._domains.items()}
+
+    def _observe(self, domain, url, keys):
+        entry = self._domains.setdefault(domain, {"urls": [], "counts": {}})
+        seen = self._urls.setdefault(domain, set())
+        url_key = hashlib.blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
+        if url_key in seen:
+            return entry
+        seen.add(url_key)
+        entry["urls"].append(url_key)
+        counts = entry["counts"]
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+        if len(counts) > BOILERPLATE_MAX_TRACKED:
+            entry["counts"] = {key: n for key, n in counts.items() if n > 1}
+        return entry
+
+    def filter(self, domain, url, paragraphs):
+        """
+        Count a page's paragraphs for its domain and drop the boilerplate.
+
+        Args:
+            domain (str): The page's domain
+            url (str): The page's URL (each URL is counted once)
+            paragraphs (list): The page's text blocks
+
+        Returns:
+            list: The paragraphs that are not boilerplate
+        """
+        keys = [paragraph_key(paragraph) for paragraph in paragraphs]
+        with self._lock:
+            entry = self._observe(domain, url, set(keys))
+            self.pages += 1
+            pages = len(entry["urls"])
+            if pages < self.min_pages:
+                return paragraphs
+            cutoff = max(2, self.share * pages)
+            counts = entry["counts"]
+            kept = []
+            for paragraph, key in zip(paragraphs, keys):
+                if counts.get(key, 0) >= cutoff:
+                    self.dropped += 1
+                    self.dropped_chars += len(paragraph)
+                else:
+                    kept.append(paragraph)
+            return kept
+
+    def save(self):
+        """Persist the table to `path`, if one was opened."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = {
+                domain: {"urls": list(entry["urls"]), "counts": dict(entry["counts"])}
+                for domain, entry in self._domains.items()
+            }
+        save_json(self.path, snapshot)
+
+    def report(self):
+        """Print how much boilerplate this run dropped."""
+        if not self.enabled:
+            return
+        print(f"Boilerplate: dropped {self.dropped} paragraphs ({self.dropped_chars} characters) "
+              f"across {self.pages} pages, {len(self._domains)} domains learned")
+
+
+class SeenUrls:
+    """
+    Which source of each role model owns each canonical URL.
+
+    Before fetching, every source claims its canonical URL; a source
+    whose URL another source of the same role model already claimed is
+    a duplicate and is neither fetched nor saved. `aliases` records
+    where a URL's <link rel="canonical"> points, so a page reached
+    through a different address is recognised too. Claims of sources
+    that end without a saved file are released; the rest are persisted,
+    so duplicates are also caught across runs while re-crawling the
+    same source stays possible. When a source saves a raw file, claims
+    of other sources pointing at that file are released: the file no
+    longer holds their text.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._claims = {}  # "role model\tcanonical" -> {"index", "url", "path"}
+        self._aliases = {}  # canonical URL -> canonical URL it declares
+        self._owned = {}  # "role model\tindex\turl" -> claim keys of that source
+        self._paths = {}  # raw file path -> claim keys pointing at it
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def open(self, path):
+        """Load claims and aliases from `path` (a JSON file)."""
+        self.path = path
+        saved = load_json(path, default={})
+        self._claims = saved.get("claims", {})
+        self._aliases = saved.get("aliases", {})
+        self._owned = {}
+        self._paths = {}
+        for key, owner in self._claims.items():
+            role_model_name = key.split("\t", 1)[0]
+            source = self._source(role_model_name, owner["index"], owner["url"])
+            self._owned.setdefault(source, []).append(key)
+            if owner["path"]:
+                self._paths.setdefault(owner["path"], set()).add(key)
+
+    @staticmethod
+    def _key(role_model_name, canonical):
+        return f"{role_model_name}\t{canonical}"
+
+    @staticmethod
+    def _source(role_model_name, index, url):
+        return f"{role_model_name}\t{index}\t{url}"
+
+    def resolve(self, canonical):
+        """The canonical URL a page declared for itself, or None if unknown."""
+        with self._lock:
+            return self._aliases.get(canonical)
+
+    def add_alias(self, canonical, target):
+        """Remember that the page at `canonical` declares `target` as canonical."""
+        with self._lock:
+            self._aliases[canonical] = target
+
+    def claim(self, role_model_name, index, url, canonical):
+        """
+        Claim a canonical URL for one source.
+
+        Returns:
+            dict: The owning source ({"index", "url", "path"}) if another
+                source already holds it, otherwise None
+        """
+        key = self._key(role_model_name, canonical)
+        with self._lock:
+            owner = self._claims.get(key)
+            if owner and (owner["index"], owner["url"]) != (index, url):
+                return owner
+            if owner is None:
+                self._claims[key] = {"index": index, "url": url, "path": None}
+                self._owned.setdefault(self._source(role_model_name, index, url), []).append(key)
+            return None
+
+    def _forget(self, key):
+        """Remove one claim from every table (lock held)."""
+        owner = self._claims.pop(key, None)
+        if owner is None:
+            return
+        role_model_name = key.split("\t", 1)[0]
+        source = self._source(role_model_name, owner["index"], owner["url"])
+        keys = self._owned.get(source, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self._owned.pop(source, None)
+        if owner["path"]:
+            self._paths.get(owner["path"], set()).discard(key)
+
+    def settle(self, role_model_name, index, url, filepath):
+        """Record the file a source's claims produced, releasing claims it overwrote."""
+        with self._lock:
+            keys = self._owned.get(self._source(role_model_name, index, url), [])
+            for key in list(self._paths.get(filepath, ())):
+                if key not in keys:
+                    self._forget(key)
+            for key in keys:
+                old = self._claims[key]["path"]
+                if old and old != filepath:
+                    self._paths.get(old, set()).discard(key)
+                self._claims[key]["path"] = filepath
+                self._paths.setdefault(filepath, set()).add(key)
+
+    def release(self, role_model_name, index, url):
+        """Drop a source's claims after it ended without a saved file."""
+        with self._lock:
+            for key in list(self._owned.get(self._source(role_model_name, index, url), [])):
+                self._forget(key)
+
+    def drop(self, role_model_name, canonical):
+        """Forget a stale claim, e.g. one whose raw file no longer holds its page."""
+        with self._lock:
+            self._forget(self._key(role_model_name, canonical))
+
+    def save(self):
+        """Persist claims and aliases to `path`, if one was opened."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = {"claims": dict(self._claims), "aliases": dict(self._aliases)}
+        save_json(self.path, snapshot)
+
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text):
+    """
+    64-bit SimHash of a document.
+
+    Features are overlapping SHINGLE_WORDS-word shingles of the
+    lower-cased text, weighted by how often they occur. Documents that
+    share most of their text get signatures a few bits apart.
+
+    Returns:
+        int: The signature (0 for text without words)
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = Counter([" ".join(words)]) if words else Counter()
+    else:
+        shingles = Counter(
+            " ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)
+        )
+    hashed = [
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), weight)
+        for shingle, weight in shingles.items()
+    ]
+    total = sum(weight for _, weight in hashed)
+    signature = 0
+    for bit in range(SIMHASH_BITS):
+        # The bit is set when the shingles having it outweigh the rest
+        if 2 * sum(weight for value, weight in hashed if value >> bit & 1) > total:
+            signature |= 1 << bit
+    return signature
+
+
+class SimHashIndex:
+    """
+    On-disk index of saved documents' SimHash signatures, per role model.
+
+    Signatures within `max_distance` bits count as near-duplicates.
+    Each signature is cut into max_distance + 1 bands; by the pigeonhole
+    principle two signatures that close agree exactly on at least one
+    band, so a lookup only compares against documents sharing a band
+    bucket rather than every document. Entries are appended to a JSONL
+    file; a later entry for the same path replaces the earlier one.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.max_distance = 3
+        self._entries = {}  # raw file path -> entry
+        self._buckets = {}  # (role model, band, band value) -> set of paths
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self._file is not None
+
+    def _bands(self, signature):
+        count = self.max_distance + 1
+        width, extra = divmod(SIMHASH_BITS, count)
+        bands = []
+        shift = 0
+        for band in range(count):
+            size = width + (1 if band < extra else 0)
+            bands.append((band, signature >> shift & ((1 << size) - 1)))
+            shift += size
+        return bands
+
+    def _insert(self, entry):
+        old = self._entries.get(entry["path"])
+        if old is not None:
+            for band, value in self._bands(int(old["simhash"], 16)):
+                self._buckets.get((old["role_model"], band, value), set()).discard(old["path"])
+        self._entries[entry["path"]] = entry
+        for band, value in self._bands(int(entry["simhash"], 16)):
+            self._buckets.setdefault((entry["role_model"], band, value), set()).add(entry["path"])
+
+    def open(self, path, max_distance=3):
+        """Load the index from `path` and keep appending to it."""
+        self.close()
+        self.path = path
+        self.max_distance = max_distance
+        self._entries = {}
+        self._buckets = {}
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self._insert(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def match_or_add(self, role_model_name, signature, filepath, url, add_duplicate=False, index=None):
+        """
+        Look for a near-duplicate of a document, then index it.
+
+        The earliest source is the original: entries with a higher
+        source `index` than the document are not matched, and ties in
+        distance go to the lowest index.
+
+        Args:
+            role_model_name (str): Only this role model's documents are compared
+            signature (int): The document's simhash()
+            filepath (str): Raw file the document is saved to (its own
+                earlier entry is ignored)
+            url (str): Source URL, kept for reporting
+            add_duplicate (bool): Index the document even if it matched
+            index (int): The document's source index, if known
+
+        Returns:
+            tuple: (matching entry, distance in bits), or None
+        """
+        best = None
+        with self._lock:
+            candidates = set()
+            for band, value in self._bands(signature):
+                candidates |= self._buckets.get((role_model_name, band, value), set())
+            candidates.discard(filepath)
+            best_key = None
+            for path in candidates:
+                entry = self._entries[path]
+                if index is not None and entry.get("index") is not None and entry["index"] > index:
+                    continue
+                distance = (int(entry["simhash"], 16) ^ signature).bit_count()
+                key = (distance, entry.get("index") or 0, path)
+                if distance <= self.max_distance and (best_key is None or key < best_key):
+                    best, best_key = (entry, distance), key
+
+            current = self._entries.get(filepath)
+            unchanged = current is not None and current["role_model"] == role_model_name \
+                and int(current["simhash"], 16) == signature and current.get("index") == index
+            if (best is None or add_duplicate) and not unchanged:
+                entry = {
+                    "role_model": role_model_name,
+                    "path": filepath,
+                    "url": url,
+                    "simhash": f"{signature:016x}",
+                    "index": index,
+                }
+                self._insert(entry)
+                self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._file.flush()
+        return best
+
+    def close(self):
+        """Close the index file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# How long a URL that failed for each reason is skipped before it is tried again
+NEGATIVE_TTLS = {
+    "not_found": 7 * 24 * 60 * 60,  # 404 / 410
+    "robots": 24 * 60 * 60,  # disallowed by robots.txt
+    "too_short": 24 * 60 * 60,  # thin page: failed the minimum content check
+}
+
+
+class NegativeCache:
+    """
+    URLs known to be bad, with the reason and when the verdict expires.
+
+    A URL that answered 404/410, was disallowed by robots.txt or gave
+    too little text is remembered for NEGATIVE_TTLS[reason] seconds, so
+    recurring crawls skip it without any network call. A later success
+    (e.g. a --replay that now extracts enough text) clears the entry.
+    Expired entries are dropped when the cache is saved.
+    """
+
+    def __init__(self, ttls=None):
+        self.path = None
+        self.ttls = dict(NEGATIVE_TTLS if ttls is None else ttls)
+        self._entries = {}  # url -> {"reason", "expires", "time"}
+        self._lock = threading.Lock()
+        self.skipped = Counter()
+        self.added = 0
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def open(self, path):
+        """Load the cache from `path` (a JSON file)."""
+        self.path = path
+        self._entries = load_json(path, default={})
+
+    def lookup(self, url):
+        """
+        The unexpired entry for `url`, if it is known to be bad.
+
+        Returns:
+            dict: {"reason", "expires", "time"}, or None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None or entry["expires"] <= time.time():
+            return None
+        return entry
+
+    def skip(self, url):
+        """Reason to skip `url` without fetching it, or None; counted for report()."""
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        with self._lock:
+            self.skipped[entry["reason"]] += 1
+        return entry["reason"]
+
+    def add(self, url, reason):
+        """Remember `url` as bad for the TTL of `reason` (ignored for other reasons)."""
+        if not self.enabled or reason not in self.ttls:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[url] = {
+                "reason": reason,
+                "expires": now + self.ttls[reason],
+                "time": time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            self.added += 1
+
+    def discard(self, url):
+        """Forget `url`, e.g. after it produced a saved file."""
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def save(self):
+        """Persist unexpired entries to `path`, if one was opened."""
+        if not self.path:
+            return
+        now = time.time()
+        with self._lock:
+            snapshot = {url: entry for url, entry in self._entries.items() if entry["expires"] > now}
+        save_json(self.path, snapshot)
+
+    def report(self):
+        """Print how many fetches the cache saved this run."""
+        if not self.enabled:
+            return
+        reasons = ", ".join(f"{reason} {count}" for reason, count in self.skipped.most_common())
+        print(f"Negative cache: {sum(self.skipped.values())} URLs skipped"
+              f"{f' ({reasons})' if reasons else ''}, {self.added} added, "
+              f"{len(self._entries)} known")
@@ -0,0 +1,106 @@
+# Tests for the streaming Content-Encoding decoder in phase1_fetch
+# Run with: python -m pytest -q
+
+import gzip
+import os
+import zlib
+
+import pytest
+
+import phase1_fetch
+from phase1_fetch import FetchAborted, StreamDecoder
+
+PAGE = b"<html><body>" + os.urandom(4000).hex().encode() * 3 + b"</body></html>"
+
+
+def decode(content_encoding, blob, chunk_size=37, max_bytes=0):
+    """Feed `blob` to a StreamDecoder in small chunks, as read_body does."""
+    decoder = StreamDecoder(content_encoding, max_bytes)
+    return b"".join(
+        decoder.decompress(blob[start:start + chunk_size])
+        for start in range(0, len(blob), chunk_size)
+    )
+
+
+def raw_deflate(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def test_identity_passes_through():
+    assert decode("", PAGE) == PAGE
+    assert decode("identity", PAGE) == PAGE
+
+
+def test_gzip():
+    assert decode("gzip", gzip.compress(PAGE)) == PAGE
+    assert decode("x-gzip", gzip.compress(PAGE), chunk_size=1) == PAGE
+
+
+def test_multi_member_gzip():
+    blob = gzip.compress(PAGE[:100]) + gzip.compress(PAGE[100:5000]) + gzip.compress(PAGE[5000:])
+    assert decode("gzip", blob) == PAGE
+    assert decode("gzip", blob, chunk_size=len(blob)) == PAGE
+
+
+def test_bytes_after_last_gzip_member_are_ignored():
+    member = gzip.compress(PAGE)
+    blob = member + b"\r\n\0\0 trailing junk"
+    assert decode("gzip", blob) == PAGE
+    assert decode("gzip", blob, chunk_size=len(blob)) == PAGE
+    assert decode("gzip", blob, chunk_size=len(member)) == PAGE  # member ends on a chunk boundary
+
+
+def test_gzip_member_ending_on_a_chunk_boundary():
+    first = gzip.compress(PAGE[:5000])
+    blob = first + gzip.compress(PAGE[5000:])
+    assert decode("gzip", blob, chunk_size=len(first)) == PAGE
+
+
+def test_zlib_and_raw_deflate():
+    assert decode("deflate", zlib.compress(PAGE)) == PAGE
+    assert decode("deflate", raw_deflate(PAGE)) == PAGE
+
+
+def test_stacked_codings():
+    assert decode("deflate, gzip", gzip.compress(zlib.compress(PAGE))) == PAGE
+
+
+def test_size_cap_stops_inflating():
+    bomb = gzip.compress(b"a" * (50 * 1024 * 1024))
+    decoder = StreamDecoder("gzip", max_bytes=1024 * 1024)
+    with pytest.raises(FetchAborted, match="exceeds"):
+        decoder.decompress(bomb)
+    assert decoder._produced[0] <= 1024 * 1024 + 1
+
+
+def test_size_cap_allows_body_at_the_limit():
+    assert decode("gzip", gzip.compress(PAGE), max_bytes=len(PAGE)) == PAGE
+    with pytest.raises(FetchAborted, match="exceeds"):
+        decode("gzip", gzip.compress(PAGE), max_bytes=len(PAGE) - 1)
+
+
+class OldBrotliDecompressor:
+    """Brotli < 1.2 API: process() takes no output_buffer_limit."""
+
+    def __init__(self):
+        self._inflater = zlib.decompressobj()
+
+    def process(self, data):
+        return self._inflater.decompress(data)
+
+
+def test_brotli_without_output_buffer_limit(monkeypatch):
+    fake = type("brotli", (), {"Decompressor": OldBrotliDecompressor, "error": zlib.error})
+    monkeypatch.setattr(phase1_fetch, "brotli", fake)
+    monkeypatch.setattr(phase1_fetch, "CONTENT_ENCODINGS", ("br", "gzip", "deflate"))
+    assert decode("br", zlib.compress(PAGE), max_bytes=len(PAGE)) == PAGE
+    with pytest.raises(FetchAborted, match="exceeds"):
+        decode("br", zlib.compress(PAGE), max_bytes=len(PAGE) - 1)
+
+
+def test_unsupported_and_corrupt_bodies_are_rejected():
+    with pytest.raises(FetchAborted, match="not supported"):
+        StreamDecoder("compress")
+    with pytest.raises(FetchAborted, match="could not decode"):
+        decode("gzip", b"not gzip at all" * 10)